@@ -0,0 +1,76 @@
+"""Insert and query cost of the meeting archive as it grows.
+
+    python -m benchmarks.bench_archive [--meetings 20000] [--words 800] [--repeat 20]
+
+Builds an archive of synthetic meetings (transcripts of --words words drawn
+from a vocabulary with a Zipf-like distribution plus a few rare project
+names, minutes from ``synthetic_mom``) in a temporary directory, then times
+typical searches: a common word, a rare name, a phrase, a natural-language
+question and a date-filtered query.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import SENTENCES, synthetic_mom
+from noteninja.archive import MeetingArchive
+
+QUERIES = {
+    "common word": ("budget", {}),
+    "rare name": ("project-417", {}),
+    "phrase": ('"revised schedule"', {}),
+    "question": ("what did we decide about the vendor shortlist", {}),
+    "date filtered": ("audit findings", {"date_from": "2024-07-01", "date_to": "2024-09-30"}),
+}
+
+
+def synthetic_meetings(count, words, seed=0):
+    rng = np.random.default_rng(seed)
+    vocabulary = sorted({w.strip(".,:").lower() for s in SENTENCES for w in s.split()})
+    vocabulary += [f"term{i}" for i in range(5000)]
+    weights = 1 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    days = np.datetime64("2022-01-01") + rng.integers(0, 365 * 3, count)
+    for i in range(count):
+        picks = rng.choice(len(vocabulary), words, p=weights)
+        transcript = " ".join(vocabulary[j] for j in picks) + f" project-{rng.integers(0, 2000)}"
+        mom = f"Meeting {i} on project-{rng.integers(0, 2000)}\n" + synthetic_mom(8 + i % 8)
+        yield transcript, mom, str(days[i])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meetings", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=800)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = MeetingArchive(os.path.join(directory, "archive.sqlite3"), enabled=True)
+        started = time.perf_counter()
+        for transcript, mom, day in synthetic_meetings(args.meetings, args.words):
+            archive.add(transcript, mom, day, source="benchmark")
+        insert_s = time.perf_counter() - started
+        archive.optimize()
+        stats = archive.stats()
+        print(f"{args.meetings} meetings inserted in {insert_s:.1f} s "
+              f"({insert_s / args.meetings * 1000:.2f} ms each, index included), "
+              f"archive {stats['bytes'] / 1e6:.0f} MB")
+
+        print(f"{'query':>14}  {'hits':>4}  {'p50 ms':>7}  {'p95 ms':>7}")
+        for label, (query, filters) in QUERIES.items():
+            times = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                hits = archive.search(query, limit=20, **filters)
+                times.append((time.perf_counter() - started) * 1000)
+            p95 = sorted(times)[max(0, int(len(times) * 0.95) - 1)]
+            print(f"{label:>14}  {len(hits):4d}  {statistics.median(times):7.2f}  {p95:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare the legacy temp-file audio path with the in-memory ingestion path.
+
+    python -m benchmarks.bench_audio_ingest [--minutes 10 60 120] [--rate 44100] [--channels 1]
+
+Legacy: upload bytes -> temp WAV on disk -> sr.AudioFile -> recognizer.record().
+In-memory: upload bytes -> decode_audio() -> ArraySource -> per-segment AudioData.
+Each case runs in a fresh process so peak RSS is not shared between them.
+No network calls are made; segments are only prepared, not recognised. With
+--encode both paths also build the FLAC payload recognize_google would upload.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.harness import peak_rss_mb, run_isolated
+from benchmarks.synthetic import write_synthetic_wav
+
+
+def legacy_path(data, encode):
+    import speech_recognition as sr
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+        f.write(data)
+        path = f.name
+    try:
+        recognizer = sr.Recognizer()
+        with sr.AudioFile(path) as source:
+            audio = recognizer.record(source)
+        return len(audio.get_flac_data()) if encode else len(audio.frame_data)
+    finally:
+        os.remove(path)
+
+
+def in_memory_path(data, encode):
+    import speech_recognition as sr
+    from noteninja.audio_io import ArraySource, decode_audio
+    from noteninja.transcription import frame_energies, plan_segments
+
+    samples, rate = decode_audio(data, "upload.wav")
+    source = ArraySource(samples, rate)
+    energies, frame_len = frame_energies(source)
+    total = 0
+    for start, end, _ in plan_segments(energies, frame_len, rate, source.n_frames):
+        segment = np.ascontiguousarray(source.read(start, end))
+        audio = sr.AudioData(memoryview(segment).cast("B"), rate, 2)
+        total += len(audio.get_flac_data()) if encode else len(audio.frame_data)
+    return total
+
+
+CASES = {"legacy": legacy_path, "in-memory": in_memory_path}
+
+
+def _run_case(case, input_path, encode):
+    with open(input_path, "rb") as f:
+        data = f.read()
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    payload = CASES[case](data, encode)
+    elapsed = time.perf_counter() - started
+    peak = peak_rss_mb()
+    return {"wall_s": elapsed, "peak_rss_mb": peak, "extra_rss_mb": peak - baseline,
+            "payload_mb": payload / (1024 * 1024)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 120])
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument("--encode", action="store_true", help="include FLAC encoding of the upload payload")
+    args = parser.parse_args(argv)
+
+    print(f"{'minutes':>8} {'path':>10} {'wall s':>8} {'peak MB':>9} {'extra MB':>9} {'payload MB':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for minutes in args.minutes:
+            input_path = os.path.join(directory, f"{minutes:g}min.wav")
+            write_synthetic_wav(input_path, minutes, args.rate, args.channels)
+            for case in CASES:
+                r = run_isolated(_run_case, case, input_path, args.encode)
+                print(f"{minutes:>8g} {case:>10} {r['wall_s']:>8.2f} {r['peak_rss_mb']:>9.1f} "
+                      f"{r['extra_rss_mb']:>9.1f} {r['payload_mb']:>11.1f}")
+            os.remove(input_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Capture-thread cost and stored bytes per capture profile.
+
+    python -m benchmarks.bench_capture [--minutes 10] [--rate 44100] [--channels 2]
+
+Synthetic speech-like audio is pushed through ``StreamingRecorder`` in
+1024-frame device chunks, as the sounddevice thread does (without real-time
+pacing). Reported per profile: time spent in ``push`` per chunk (the work
+done on the capture thread, which has ~23 ms per chunk at 44.1 kHz), bytes
+captured from the device and bytes stored on disk. FLAC/Opus profiles are
+skipped when ffmpeg is not installed.
+"""
+import argparse
+import shutil
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+from benchmarks.harness import run_isolated
+from benchmarks.synthetic import write_synthetic_wav
+from noteninja.capture import PROFILES
+
+CHUNK_FRAMES = 1024
+
+
+def _run_case(profile_name, wav_path, segment_s):
+    from noteninja.capture import StreamingRecorder
+    with wave.open(wav_path, "rb") as wav:
+        channels, rate = wav.getnchannels(), wav.getframerate()
+        chunks = []
+        while True:
+            chunk = wav.readframes(CHUNK_FRAMES)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = StreamingRecorder(directory, channels, rate, segment_s=segment_s,
+                                     profile=PROFILES[profile_name]).start()
+        push_times = np.empty(len(chunks))
+        started = time.perf_counter()
+        for i, chunk in enumerate(chunks):
+            pushed = time.perf_counter()
+            recorder.push(chunk)
+            push_times[i] = time.perf_counter() - pushed
+        recorder.stop()
+        stats = recorder.stats()
+    return {"seconds": time.perf_counter() - started, "push_us": float(np.mean(push_times) * 1e6),
+            "push_p99_us": float(np.percentile(push_times, 99) * 1e6), "captured": stats["bytes_captured"],
+            "stored": stats["bytes_stored"], "dropped": stats["dropped_chunks"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--segment-s", type=float, default=60)
+    args = parser.parse_args()
+
+    print(f"{'profile':>12}  {'push us':>7}  {'p99 us':>7}  {'captured MB':>11}  {'stored MB':>9}  {'ratio':>6}  {'dropped':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        wav_path = f"{directory}/device.wav"
+        write_synthetic_wav(wav_path, args.minutes, rate=args.rate, channels=args.channels)
+        for name, profile in PROFILES.items():
+            if profile.encoding != "wav" and shutil.which("ffmpeg") is None:
+                print(f"{name:>12}  skipped (ffmpeg not found)")
+                continue
+            result = run_isolated(_run_case, name, wav_path, args.segment_s)
+            if "error" in result:
+                print(f"{name:>12}  {result['error']}")
+                continue
+            print(f"{name:>12}  {result['push_us']:7.1f}  {result['push_p99_us']:7.1f}  {result['captured'] / 1e6:11.1f}"
+                  f"  {result['stored'] / 1e6:9.1f}  {result['captured'] / max(result['stored'], 1):5.1f}x"
+                  f"  {result['dropped']:7d}")
+
+
+if __name__ == "__main__":
+    main()
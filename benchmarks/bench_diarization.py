@@ -0,0 +1,71 @@
+"""Cost and accuracy of speaker diarization as meetings get longer.
+
+    python -m benchmarks.bench_diarization [--minutes 5 20 60] [--speakers 3]
+
+Each case writes a synthetic meeting (``write_synthetic_meeting``: turns of
+4-12 s by voices with different pitch and formants), then diarizes it from
+the WAV file in a fresh process. Reported: wall time, speed relative to real
+time, peak RSS (should stay flat as the meeting grows), speakers found and
+purity (share of speech assigned to the cluster's majority speaker).
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from benchmarks.harness import peak_rss_mb, run_isolated
+from benchmarks.synthetic import write_synthetic_meeting
+
+RESOLUTION = 160   # purity is measured on 10 ms steps at 16 kHz
+
+
+def purity(turns, truth, n_frames):
+    found = np.full(n_frames // RESOLUTION + 1, -1, dtype=np.int16)
+    expected = np.full_like(found, -1)
+    for turn in turns:
+        found[turn.start // RESOLUTION:turn.end // RESOLUTION] = turn.speaker
+    for start, end, speaker in truth:
+        expected[start // RESOLUTION:end // RESOLUTION] = speaker
+    speech = expected >= 0
+    correct = sum(Counter(expected[speech & (found == label)].tolist()).most_common(1)[0][1]
+                  for label in set(found[speech].tolist()) if label >= 0)
+    return correct / max(1, int(speech.sum()))
+
+
+def _run_case(path, truth):
+    from noteninja.diarize import diarize
+    from noteninja.transcription import WavSource
+    with WavSource(path) as source:
+        started = time.perf_counter()
+        turns = diarize(source)
+        seconds = time.perf_counter() - started
+        n_frames, rate = source.n_frames, source.sample_rate
+    return {"seconds": seconds, "realtime": n_frames / rate / seconds, "peak_rss_mb": peak_rss_mb(),
+            "speakers": len({turn.speaker for turn in turns}), "turns": len(turns),
+            "purity": purity(turns, truth, n_frames)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 20, 60])
+    parser.add_argument("--speakers", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'minutes':>7}  {'seconds':>7}  {'x real':>7}  {'peak MB':>7}  {'speakers':>8}  {'turns':>6}  {'purity':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for minutes in args.minutes:
+            path = os.path.join(directory, f"meeting-{minutes}.wav")
+            truth = write_synthetic_meeting(path, minutes, args.speakers)
+            result = run_isolated(_run_case, path, truth)
+            if "error" in result:
+                print(f"{minutes:7g}  {result['error']}")
+                continue
+            print(f"{minutes:7g}  {result['seconds']:7.2f}  {result['realtime']:7.0f}  {result['peak_rss_mb']:7.1f}"
+                  f"  {result['speakers']:8d}  {result['turns']:6d}  {result['purity']:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
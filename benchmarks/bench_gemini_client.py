@@ -0,0 +1,75 @@
+"""Tail latency and success rate of the Gemini client against the local fake API.
+
+    python -m benchmarks.bench_gemini_client [--requests 300] [--concurrency 16]
+
+The fake server answers in --latency seconds, except --tail-fraction of
+requests that take --tail-latency, and fails --error-rate of requests with 503.
+Cases: a single attempt per call (like the old direct ``generate_content``),
+jittered retries, and retries plus a hedged request after --hedge-after.
+Calls are issued through ``agenerate_many``.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from benchmarks.fake_gemini import FakeGeminiServer
+from noteninja.gemini import ModelError, create_client
+
+CASES = {
+    "single": {"max_attempts": 1},
+    "retry": {},
+    "retry+hedge": {"hedge": True},
+}
+
+
+async def _timed(client, prompt, timeout):
+    started = time.perf_counter()
+    try:
+        await client.agenerate(prompt, timeout)
+        return time.perf_counter() - started, None
+    except ModelError as e:
+        return time.perf_counter() - started, type(e).__name__
+
+
+async def _run(client, requests, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            return await _timed(client, f"prompt {i}", timeout)
+
+    return await asyncio.gather(*(one(i) for i in range(requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tail-fraction", type=float, default=0.05)
+    parser.add_argument("--tail-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--hedge-after", type=float, default=0.25)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"{'case':>12}  {'ok %':>6}  {'p50 ms':>7}  {'p95 ms':>7}  {'p99 ms':>7}  {'sent':>5}  {'hedged':>6}")
+    for case, options in CASES.items():
+        options = dict(options)
+        hedge_after = args.hedge_after if options.pop("hedge", False) else None
+        with FakeGeminiServer(latency=args.latency, tail_fraction=args.tail_fraction,
+                              tail_latency=args.tail_latency, error_rate=args.error_rate) as server:
+            client = create_client("fake-key", "fake-model", base_url=server.url, hedge_after=hedge_after,
+                                   base_delay=0.05, **options)
+            results = asyncio.run(_run(client, args.requests, args.concurrency, args.timeout))
+            sent = server.counts["requests"]
+        latencies = np.array([seconds for seconds, _ in results]) * 1000
+        ok = sum(1 for _, error in results if error is None) / len(results)
+        p50, p95, p99 = np.percentile(latencies, (50, 95, 99))
+        print(f"{case:>12}  {ok:6.1%}  {p50:7.0f}  {p95:7.0f}  {p99:7.0f}  {sent:5d}  {client.stats()['hedged']:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cold-start import time and per-rerun setup cost.
+
+    python -m benchmarks.bench_imports [--repeat 5]
+
+Cold start: every module the Streamlit pages and the batch CLI import is
+imported in a fresh interpreter with ``-X importtime``; reported are the
+median cumulative import time and which heavy third-party packages
+(pypdf, python-docx, SpeechRecognition, fpdf, sounddevice, ...) were
+loaded as a side effect. Those should only appear once the code path that
+needs them runs.
+
+Rerun: Streamlit executes the page script again on every interaction. The
+second table times the setup the script does each time, a new Gemini client
+and recognizer backend per run versus the process-wide ``get_model`` and
+``get_default_backend``, plus the one-off cost of the first lazy import.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import run_isolated
+
+MODULES = (
+    "noteninja.pipeline",
+    "noteninja.extractors",
+    "noteninja.archive",
+    "noteninja.capture",
+    "noteninja.batch",
+)
+# Everything pages/1_Program.py imports from noteninja (streamlit itself aside).
+PAGE_IMPORTS = "noteninja.capture, noteninja.archive, noteninja.cache, noteninja.diarize, " \
+               "noteninja.jobs, noteninja.live, noteninja.pipeline, noteninja.extractors"
+HEAVY = ("pypdf", "docx", "speech_recognition", "fpdf", "sounddevice", "audio_recorder_streamlit",
+         "google.generativeai", "pydub")
+
+
+def import_profile(statement):
+    """(total ms, heavy packages loaded) for ``import <statement>`` in a new interpreter."""
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {statement}"],
+                            capture_output=True, text=True, check=True).stderr
+    total_us, loaded = 0, set()
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        if len(name) - len(name.lstrip()) == 1:
+            total_us += int(cumulative)     # top-level imports carry everything below them
+        if name.strip() in HEAVY:
+            loaded.add(name.strip())
+    return total_us / 1000, sorted(loaded)
+
+
+def _per_run(factory, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        factory()
+    return (time.perf_counter() - started) / runs * 1000
+
+
+def _rerun_case(runs):
+    from noteninja import pipeline
+    results = {
+        "configure_model per rerun": _per_run(lambda: pipeline.configure_model("benchmark-key"), runs),
+        "get_model per rerun": _per_run(lambda: pipeline.get_model("benchmark-key"), runs),
+    }
+    started = time.perf_counter()
+    from noteninja.transcription import GoogleRecognizerBackend
+    GoogleRecognizerBackend()
+    results["first recognizer (lazy import)"] = (time.perf_counter() - started) * 1000
+    results["new recognizer per transcription"] = _per_run(GoogleRecognizerBackend, runs)
+    results["get_default_backend per transcription"] = _per_run(pipeline.get_default_backend, runs)
+    started = time.perf_counter()
+    from noteninja.pdf_render import render_mom_pdf
+    render_mom_pdf("# Minutes\n\n- first item")
+    results["first PDF render (lazy import + fonts)"] = (time.perf_counter() - started) * 1000
+    results["later PDF render"] = _per_run(lambda: render_mom_pdf("# Minutes\n\n- first item"), 10)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=200, help="simulated reruns per setup step")
+    args = parser.parse_args()
+
+    print(f"{'cold import':<24}  {'median ms':>9}  {'min ms':>7}  heavy packages loaded")
+    for label, statement in [*((m, m) for m in MODULES), ("Program page imports", PAGE_IMPORTS)]:
+        times, loaded = [], []
+        for _ in range(args.repeat):
+            total_ms, loaded = import_profile(statement)
+            times.append(total_ms)
+        print(f"{label:<24}  {statistics.median(times):9.1f}  {min(times):7.1f}  {', '.join(loaded) or '-'}")
+
+    print()
+    result = run_isolated(_rerun_case, args.runs)
+    if "error" in result:
+        print(f"rerun setup failed: {result['error']}")
+        return
+    print(f"{'rerun setup':<40}  {'ms':>8}")
+    for label, ms in result.items():
+        print(f"{label:<40}  {ms:8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Per-document cost of rendering MOM PDFs: the old per-request FPDF setup vs
+the shared renderer in noteninja.pdf_render.
+
+    python -m benchmarks.bench_pdf_render [--documents 200] [--paragraphs 40]
+
+Legacy: a new FPDF, ``add_font("Arial.ttf", uni=True)`` and a font subset per
+document, the whole MOM written as 10 mm multi_cells (run from a scratch
+directory holding a copy of Arial.ttf, where FPDF keeps its .pkl metric
+cache). Shared: ``render_mom_pdf`` with process-wide font metrics and subsets.
+Each case runs in a fresh process; "first" includes the one-off font setup.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.harness import run_isolated
+from benchmarks.synthetic import synthetic_mom
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Arial.ttf")
+
+
+def legacy_render(text):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.add_font("Arial", "", "Arial.ttf", uni=True)
+    pdf.set_font("Arial", size=12)
+    lines = [line.encode('latin-1', 'ignore').decode('latin-1') for line in text.splitlines()]
+    for line in lines:
+        pdf.multi_cell(0, 10, line)
+    return pdf.output(dest="S").encode('latin-1')
+
+
+def shared_render(text):
+    from noteninja.pdf_render import render_mom_pdf
+    return render_mom_pdf(text)
+
+
+CASES = {"legacy": legacy_render, "shared": shared_render}
+
+
+def _run_case(case, documents, paragraphs):
+    render = CASES[case]
+    texts = [synthetic_mom(paragraphs + i % 5) for i in range(documents)]
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copy(FONT_PATH, directory)
+        previous = os.getcwd()
+        os.chdir(directory)
+        try:
+            times, sizes = [], []
+            for text in texts:
+                started = time.perf_counter()
+                sizes.append(len(render(text)))
+                times.append(time.perf_counter() - started)
+        finally:
+            os.chdir(previous)
+    steady = times[1:] or times
+    return {"first_ms": times[0] * 1000, "median_ms": statistics.median(steady) * 1000,
+            "docs_per_s": len(steady) / sum(steady), "kb_per_doc": statistics.mean(sizes) / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"{'path':>8}  {'first ms':>9}  {'median ms':>9}  {'docs/s':>8}  {'KB/doc':>7}")
+    for case in CASES:
+        r = run_isolated(_run_case, case, args.documents, args.paragraphs)
+        if "error" in r:
+            print(f"{case:>8}  failed: {r['error']}")
+            continue
+        print(f"{case:>8}  {r['first_ms']:9.1f}  {r['median_ms']:9.2f}  {r['docs_per_s']:8.1f}  {r['kb_per_doc']:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Local stand-in for the Gemini REST API, for offline client tests and benchmarks.
+
+    python -m benchmarks.fake_gemini [--port 8765] [--latency 0.2] [--tail 0.05:2.0] [--rpm 120] [--error-rate 0.02]
+
+Serves ``POST /v1beta/models/<model>:generateContent`` and
+``:streamGenerateContent?alt=sse``. Latency is ``--latency`` seconds, except
+for a ``--tail`` fraction of requests that take the given tail time; requests
+beyond ``--rpm`` in a sliding minute get 429 with Retry-After, and
+``--error-rate`` of requests fail with 503. Point the app at it with
+``NOTENINJA_GEMINI_URL=http://127.0.0.1:8765``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import synthetic_mom
+
+
+class FakeGeminiServer:
+    def __init__(self, port=0, latency=0.05, tail_fraction=0.0, tail_latency=1.0, rpm=None,
+                 error_rate=0.0, reply=None, seed=0):
+        self.latency = latency
+        self.tail_fraction = tail_fraction
+        self.tail_latency = tail_latency
+        self.rpm = rpm
+        self.error_rate = error_rate
+        self.reply = reply or synthetic_mom(8)
+        self.counts = {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0}
+        self._rng = random.Random(seed)
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _decide(self):
+        """Return (status, delay) for the next request."""
+        with self._lock:
+            self.counts["requests"] += 1
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if self.rpm and len(self._recent) >= self.rpm:
+                self.counts["rate_limited"] += 1
+                return 429, 60 - (now - self._recent[0])
+            self._recent.append(now)
+            if self._rng.random() < self.error_rate:
+                self.counts["errors"] += 1
+                return 503, 0.0
+            self.counts["ok"] += 1
+            slow = self._rng.random() < self.tail_fraction
+            return 200, self.tail_latency if slow else self.latency
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status, payload, headers=()):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt = "".join(part.get("text", "") for content in request.get("contents", [])
+                                 for part in content.get("parts", []))
+                status, delay = server._decide()
+                if status == 429:
+                    self._json(429, {"error": {"code": 429, "message": "Resource has been exhausted"}},
+                               [("Retry-After", f"{max(delay, 0.01):.2f}")])
+                    return
+                if status != 200:
+                    self._json(status, {"error": {"code": status, "message": "The service is unavailable"}})
+                    return
+                time.sleep(delay)
+                usage = {"promptTokenCount": len(prompt) // 4 + 1,
+                         "candidatesTokenCount": len(server.reply) // 4 + 1}
+                if "streamGenerateContent" in self.path:
+                    self._stream(server.reply, usage)
+                else:
+                    self._json(200, {"candidates": [{"content": {"parts": [{"text": server.reply}]},
+                                                     "finishReason": "STOP"}],
+                                     "usageMetadata": usage})
+
+            def _stream(self, text, usage):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                lines = text.splitlines(keepends=True)
+                for i, line in enumerate(lines):
+                    event = {"candidates": [{"content": {"parts": [{"text": line}]}}]}
+                    if i == len(lines) - 1:
+                        event["usageMetadata"] = usage
+                    data = f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8")
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--tail", default="0:0", help="FRACTION:SECONDS of slow responses")
+    parser.add_argument("--rpm", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    fraction, seconds = (float(v) for v in args.tail.split(":"))
+    server = FakeGeminiServer(args.port, args.latency, fraction, seconds, args.rpm, args.error_rate)
+    print(f"Fake Gemini API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
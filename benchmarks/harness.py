@@ -0,0 +1,30 @@
+"""Helpers for running a benchmark case in a fresh process."""
+import multiprocessing
+import resource
+import sys
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _child(target, args, results):
+    try:
+        results.put(target(*args))
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_isolated(target, *args):
+    """Run ``target(*args)`` in a spawned process and return its result dict.
+
+    A fresh interpreter per case keeps peak RSS from leaking between cases.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    process = ctx.Process(target=_child, args=(target, args, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
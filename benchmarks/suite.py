@@ -0,0 +1,233 @@
+"""End-to-end benchmark suite for the MOM pipeline stages.
+
+    python -m benchmarks.suite run [--quick] [--repeat 3] [--output benchmarks/baselines/NAME.json]
+    python -m benchmarks.suite compare BASE.json NEW.json [--threshold 0.15]
+
+``run`` generates synthetic inputs (speech-like WAV/MP3, a multi-hundred-page
+PDF), times every stage in a fresh process and records median/min wall time,
+throughput and peak RSS. Nothing talks to the network: transcription uses a
+stub recognizer backend and MOM generation a fake Gemini model. ``compare``
+prints the change per stage and exits with status 1 when a stage got slower
+(or used more memory) than ``--threshold`` allows.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.harness import peak_rss_mb, run_isolated
+from benchmarks.synthetic import synthetic_mom, write_synthetic_mp3, write_synthetic_pdf, write_synthetic_wav
+
+DEFAULT_OUTPUT = os.path.join("benchmarks", "baselines", "latest.json")
+FULL_SIZES = {"audio_minutes": 10, "pdf_pages": 300, "text_mb": 32}
+QUICK_SIZES = {"audio_minutes": 1, "pdf_pages": 60, "text_mb": 4}
+
+
+# --- Offline stand-ins ---
+class StubRecognizer:
+    """Recognizer backend that returns fixed text for every segment."""
+
+    def transcribe(self, segment):
+        return f"segment {segment.index} was transcribed"
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    model_name = "benchmark-fake"
+
+    def generate_content(self, prompt, stream=False, **options):
+        text = synthetic_mom()
+        return [FakeResponse(text)] if stream else FakeResponse(text)
+
+
+# --- Stages ---
+# Each stage takes the input paths and returns (amount processed, unit).
+def stage_convert_mp3_to_wav(inputs):
+    from noteninja.pipeline import convert_mp3_to_wav
+    output = os.path.join(os.path.dirname(inputs["mp3"]), "converted.wav")
+    convert_mp3_to_wav(inputs["mp3"], output)
+    return inputs["audio_minutes"] * 60, "audio s"
+
+
+def stage_transcribe_audio(inputs):
+    from noteninja.pipeline import transcribe_audio
+    if transcribe_audio(inputs["wav"], backend=StubRecognizer()) is None:
+        raise RuntimeError("transcription failed")
+    return inputs["audio_minutes"] * 60, "audio s"
+
+
+def stage_extract_text_from_pdf(inputs):
+    from noteninja.pipeline import extract_text_from_pdf
+    extract_text_from_pdf(inputs["pdf"])
+    return inputs["pdf_pages"], "pages"
+
+
+def stage_normalize_text(inputs):
+    from noteninja.pipeline import normalize_text
+    with open(inputs["raw_text"], encoding="utf-8") as f:
+        text = f.read()
+    normalize_text(text)
+    return len(text) / (1024 * 1024), "MB"
+
+
+def stage_generate_pdf_from_string_files(inputs):
+    from noteninja.pipeline import generate_mom, generate_pdf_from_string_files, prepare_mom_prompt_files
+    with open(inputs["text"], encoding="utf-8") as f:
+        text = f.read()
+    generate_pdf_from_string_files(generate_mom(text, prepare_mom_prompt_files, FakeModel()))
+    return 1, "documents"
+
+
+STAGES = {
+    "convert_mp3_to_wav": stage_convert_mp3_to_wav,
+    "transcribe_audio": stage_transcribe_audio,
+    "extract_text_from_pdf": stage_extract_text_from_pdf,
+    "normalize_text": stage_normalize_text,
+    "generate_pdf_from_string_files": stage_generate_pdf_from_string_files,
+}
+
+
+def _run_stage(name, inputs, repeat):
+    # The pipeline prints progress and whole transcripts; keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Import outside the timed runs so the first repeat is not penalised.
+        import noteninja.pipeline  # noqa: F401
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            amount, unit = STAGES[name](inputs)
+            times.append(time.perf_counter() - started)
+    median = statistics.median(times)
+    return {"median_s": median, "min_s": min(times), "runs": len(times),
+            "throughput": amount / median if median else None, "unit": f"{unit}/s",
+            "peak_rss_mb": peak_rss_mb()}
+
+
+# --- Inputs ---
+def prepare_inputs(directory, sizes):
+    inputs = dict(sizes)
+    inputs["wav"] = os.path.join(directory, "meeting.wav")
+    write_synthetic_wav(inputs["wav"], sizes["audio_minutes"])
+    mp3 = os.path.join(directory, "meeting.mp3")
+    if write_synthetic_mp3(mp3, inputs["wav"]):
+        inputs["mp3"] = mp3
+    inputs["pdf"] = os.path.join(directory, "board_pack.pdf")
+    write_synthetic_pdf(inputs["pdf"], sizes["pdf_pages"])
+    from noteninja.pdf_extract import extract_text
+    inputs["text"] = os.path.join(directory, "board_pack.txt")
+    with open(inputs["text"], "w", encoding="utf-8") as f:
+        f.write(extract_text(inputs["pdf"]))
+    # Raw extracted text repeated to a size where normalisation is measurable.
+    inputs["raw_text"] = os.path.join(directory, "raw.txt")
+    with open(inputs["text"], encoding="utf-8") as f:
+        text = f.read()
+    with open(inputs["raw_text"], "w", encoding="utf-8") as f:
+        f.write(text * max(1, sizes["text_mb"] * 1024 * 1024 // len(text)))
+    return inputs
+
+
+# --- Commands ---
+def run(args):
+    sizes = QUICK_SIZES if args.quick else FULL_SIZES
+    stages = args.stages or list(STAGES)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        print("Generating inputs...")
+        inputs = prepare_inputs(directory, sizes)
+        for name in stages:
+            if name == "convert_mp3_to_wav" and "mp3" not in inputs:
+                print(f"{name:>32}  skipped (ffmpeg not found)")
+                continue
+            result = run_isolated(_run_stage, name, inputs, args.repeat)
+            results[name] = result
+            if "error" in result:
+                print(f"{name:>32}  failed: {result['error']}")
+            else:
+                print(f"{name:>32}  {result['median_s']:8.3f} s  {result['throughput']:10.2f} {result['unit']:<12}"
+                      f"{result['peak_rss_mb']:8.1f} MB")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "sizes": sizes,
+        },
+        "stages": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    if base["meta"].get("sizes") != new["meta"].get("sizes"):
+        print("Warning: the runs used different input sizes.")
+
+    regressions = []
+    print(f"{'stage':>32}  {'base s':>8}  {'new s':>8}  {'time':>7}  {'RSS':>7}")
+    for name, before in base["stages"].items():
+        after = new["stages"].get(name)
+        if after is None or "error" in before or "error" in after:
+            print(f"{name:>32}  not comparable")
+            continue
+        time_change = after["median_s"] / before["median_s"] - 1
+        rss_change = after["peak_rss_mb"] / before["peak_rss_mb"] - 1
+        flagged = time_change > args.threshold or rss_change > args.threshold
+        if flagged:
+            regressions.append(name)
+        print(f"{name:>32}  {before['median_s']:8.3f}  {after['median_s']:8.3f}  {time_change:+7.1%}  "
+              f"{rss_change:+7.1%}{'  REGRESSION' if flagged else ''}")
+    for name in new["stages"].keys() - base["stages"].keys():
+        print(f"{name:>32}  new stage (no baseline)")
+
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print("No regressions.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and write a JSON baseline")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--quick", action="store_true", help="Small inputs for a fast smoke run")
+    run_parser.add_argument("--stages", nargs="+", choices=list(STAGES))
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two JSON results and flag regressions")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.15,
+                                help="Allowed relative slowdown/memory growth (default 0.15)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
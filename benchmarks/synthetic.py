@@ -0,0 +1,103 @@
+"""Synthetic inputs for the benchmarks: speech-like WAV/MP3 audio, multi-speaker
+meetings and long PDFs."""
+import shutil
+import wave
+
+import numpy as np
+
+
+def write_synthetic_wav(path, minutes, rate=44100, channels=1, seed=0):
+    """Speech-like bursts of noise separated by pauses, written block by block."""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * rate)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        written = 0
+        while written < total:
+            talk = min(int(rng.uniform(3, 12) * rate), total - written)
+            pause = min(int(rng.uniform(0.3, 1.5) * rate), total - written - talk)
+            burst = rng.normal(0, 4000, talk).astype(np.int16)
+            block = np.concatenate((burst, np.zeros(pause, dtype=np.int16)))
+            wav.writeframes(np.repeat(block[:, None], channels, axis=1).tobytes())
+            written += talk + pause
+
+
+# Formant frequencies (Hz) of a few vowels; each synthetic speaker scales them.
+VOWELS = ((730, 1090, 2440), (270, 2290, 3010), (530, 1840, 2480), (300, 870, 2240), (640, 1190, 2390))
+VOICES = ((110, 1.0), (210, 1.18), (150, 0.9), (180, 1.08))   # (pitch Hz, formant scale)
+
+
+def _voiced(rng, seconds, rate, pitch, scale, syllable_s=0.2):
+    """Pulse train at ``pitch`` shaped by random vowel formants, per syllable."""
+    n = int(syllable_s * rate)
+    freqs = np.fft.rfftfreq(n, 1 / rate)
+    out = []
+    for _ in range(max(1, int(seconds / syllable_s))):
+        pulses = np.zeros(n)
+        pulses[np.arange(0, n, rate / (pitch * (1 + 0.05 * rng.standard_normal()))).astype(int)] = 1
+        envelope = sum(1 / (1 + ((freqs - f * scale) / 90) ** 2) for f in VOWELS[rng.integers(len(VOWELS))])
+        out.append(np.fft.irfft(np.fft.rfft(pulses) * envelope, n))
+    voice = np.concatenate(out)
+    return voice / np.abs(voice).max()
+
+
+def write_synthetic_meeting(path, minutes, speakers=3, rate=16000, seed=0):
+    """Turns of 4-12 s by ``speakers`` synthetic voices, written block by block.
+
+    Returns the true turns as (start, end, speaker) sample ranges.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * rate)
+    truth = []
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        written, speaker = 0, 0
+        while written < total:
+            speaker = (speaker + rng.integers(1, speakers)) % speakers if truth else 0
+            pitch, scale = VOICES[speaker % len(VOICES)]
+            talk = _voiced(rng, rng.uniform(4, 12), rate, pitch, scale)[:total - written] * 16000
+            pause = np.zeros(min(int(rng.uniform(0.2, 0.8) * rate), total - written - len(talk)))
+            block = np.concatenate((talk, pause)) + rng.normal(0, 100, len(talk) + len(pause))
+            wav.writeframes(np.clip(block, -32768, 32767).astype("<i2").tobytes())
+            truth.append((written, written + len(talk), speaker))
+            written += len(block)
+    return truth
+
+
+def write_synthetic_mp3(path, wav_path):
+    """Encode ``wav_path`` to MP3; returns False when ffmpeg is not available."""
+    if shutil.which("ffmpeg") is None:
+        return False
+    from pydub import AudioSegment
+    AudioSegment.from_wav(wav_path).export(path, format="mp3")
+    return True
+
+
+SENTENCES = (
+    "The committee reviewed the quarterly budget and agreed to reduce travel costs.",
+    "Action item: the operations team will circulate the revised schedule by Friday.",
+    "Members discussed the vendor shortlist and requested two further quotations.",
+    "The chair noted that the audit findings must be closed before the next meeting.",
+    "It was decided to postpone the office move until the lease terms are confirmed.",
+)
+
+
+def write_synthetic_pdf(path, pages, seed=0):
+    from fpdf import FPDF
+    rng = np.random.default_rng(seed)
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Arial", size=10)
+    for page in range(pages):
+        pdf.add_page()
+        lines = [SENTENCES[i] for i in rng.integers(0, len(SENTENCES), 40)]
+        pdf.multi_cell(0, 6, f"Board pack page {page + 1}\n" + "\n".join(lines))
+    pdf.output(path)
+
+
+def synthetic_mom(paragraphs=40):
+    return "\n".join(f"{i + 1}. {SENTENCES[i % len(SENTENCES)]}" for i in range(paragraphs))
@@ -0,0 +1 @@
+"""Processing engines behind the NoteNinja Streamlit pages."""
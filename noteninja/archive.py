@@ -0,0 +1,294 @@
+"""Searchable archive of generated minutes.
+
+Every finished MOM is stored with its transcript (or extracted document
+text), meeting date and metadata in SQLite. An FTS5 index over title, minutes
+and transcript is kept in step by triggers, so adding a meeting updates the
+index incrementally, and queries are ranked with BM25 (title > minutes >
+transcript). Set ``NOTENINJA_ARCHIVE=off`` (or pass ``enabled=False``) to
+stop recording meetings.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+# --- Defaults ---
+ARCHIVE_PATH = os.environ.get("NOTENINJA_ARCHIVE_PATH", os.path.join("archive", "meetings.sqlite3"))
+WEIGHTS = (8.0, 2.0, 1.0)       # BM25 weight of title, minutes, transcript
+TITLE_CHARS = 120
+SNIPPET_TOKENS = 24
+RANK_LIMIT = 5000               # above this many candidates, newest matches are returned unranked
+STOPWORDS = frozenset(
+    "a about all an and any are as at be been but by can could did do does for from had has have how i if in "
+    "into is it its me my not of on or our so than that the their them then there these they this those to "
+    "us was we were what when where which who whom why will with would you your".split()
+)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meetings ("
+    " id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, title TEXT NOT NULL, meeting_date TEXT,"
+    " source TEXT NOT NULL, name TEXT NOT NULL, created REAL NOT NULL, metadata TEXT NOT NULL,"
+    " mom TEXT NOT NULL, transcript TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS meetings_date ON meetings(meeting_date)",
+)
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS meetings_fts USING fts5("
+    " title, mom, transcript, content='meetings', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS meetings_ai AFTER INSERT ON meetings BEGIN"
+    " INSERT INTO meetings_fts(rowid, title, mom, transcript) VALUES (new.id, new.title, new.mom, new.transcript);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS meetings_ad AFTER DELETE ON meetings BEGIN"
+    " INSERT INTO meetings_fts(meetings_fts, rowid, title, mom, transcript)"
+    " VALUES ('delete', old.id, old.title, old.mom, old.transcript);"
+    " END",
+)
+
+
+@dataclass
+class Hit:
+    id: int
+    title: str
+    meeting_date: str
+    source: str
+    name: str
+    created: float
+    snippet: str = ""
+    score: float = 0.0
+    ranked: bool = False        # ordered by BM25 rather than by recency
+
+
+@dataclass
+class Meeting:
+    id: int
+    title: str
+    meeting_date: str
+    source: str
+    name: str
+    created: float
+    mom: str
+    transcript: str
+    metadata: dict = field(default_factory=dict)
+
+
+# --- Helpers ---
+_TOKEN_RE = re.compile(r'"([^"]+)"|(\w+(?:[-\'.]\w+)*)', re.UNICODE)
+_HEADING_RE = re.compile(r"^[#*\s]+|[*\s:]+$")
+
+
+def title_for(mom):
+    """First non-empty line of the minutes without markdown decoration."""
+    for line in mom.splitlines():
+        line = _HEADING_RE.sub("", line).strip()
+        if line:
+            return line[:TITLE_CHARS]
+    return "Untitled meeting"
+
+
+def fts_terms(text):
+    """Free text -> FTS5 terms: quoted phrases and hyphenated words ("Q3-2024")
+    become phrases, other words quoted terms (so FTS5 syntax in the input is
+    never interpreted), and stopwords are dropped unless nothing else is left."""
+    phrases, words = [], []
+    for phrase, word in _TOKEN_RE.findall(text):
+        terms = re.findall(r"\w+", phrase or word)
+        if len(terms) > 1 or phrase:
+            if terms:
+                phrases.append('"' + " ".join(terms).lower() + '"')
+        elif terms:
+            words.append(terms[0].lower())
+    content = [w for w in words if w not in STOPWORDS] or words
+    return phrases + [f'"{word}"' for word in dict.fromkeys(content)]
+
+
+# --- Archive ---
+class MeetingArchive:
+    def __init__(self, path=ARCHIVE_PATH, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("NOTENINJA_ARCHIVE", "on").lower() not in ("0", "off", "false", "no")
+        self.enabled = enabled
+        self.path = path
+        self.fts = None             # False when this SQLite build lacks FTS5
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            try:
+                for statement in FTS_SCHEMA:
+                    self._db.execute(statement)
+                self.fts = True
+            except sqlite3.OperationalError as e:
+                print(f"Full-text search unavailable, falling back to substring search: {e}")
+                self.fts = False
+            self._db.commit()
+        return self._db
+
+    def add(self, transcript, mom, meeting_date=None, source="", name="", metadata=None):
+        """Store a meeting and return its id; the same transcript and MOM are stored once."""
+        if not self.enabled:
+            return None
+        transcript, mom = transcript or "", mom or ""
+        key = hashlib.sha256(f"{len(transcript)}:{transcript}{mom}".encode("utf-8")).hexdigest()
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT id FROM meetings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                return row[0]
+            cursor = db.execute(
+                "INSERT INTO meetings (key, title, meeting_date, source, name, created, metadata, mom, transcript)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, title_for(mom), meeting_date, source, name, time.time(),
+                 json.dumps(metadata or {}), mom, transcript),
+            )
+            db.commit()
+            return cursor.lastrowid
+
+    def search(self, query="", limit=20, date_from=None, date_to=None, sources=None):
+        """Best BM25 matches for ``query`` (newest meetings when it is empty).
+
+        Dates are ISO strings compared with ``meeting_date``. All words must
+        match; if no meeting has them all, any word will do (OR).
+        """
+        if not self.enabled:
+            return []
+        filters, params = [], []
+        if date_from:
+            filters.append("m.meeting_date >= ?")
+            params.append(str(date_from))
+        if date_to:
+            filters.append("m.meeting_date <= ?")
+            params.append(str(date_to))
+        if sources:
+            filters.append(f"m.source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        with self._lock:
+            db = self._conn()
+            if not query.strip():
+                where = f"WHERE {' AND '.join(filters)}" if filters else ""
+                rows = db.execute(
+                    f"SELECT m.id, m.title, m.meeting_date, m.source, m.name, m.created, '', 0.0 FROM meetings m"
+                    f" {where} ORDER BY m.meeting_date DESC, m.id DESC LIMIT ?", (*params, limit)).fetchall()
+                return [Hit(*row) for row in rows]
+            if not self.fts:
+                return self._substring_search(db, query, limit, filters, params)
+            terms = fts_terms(query)
+            if not terms:
+                return []
+            hits = self._fts_search(db, terms, "AND", limit, filters, params)
+            if not hits and len(terms) > 1:
+                hits = self._fts_search(db, terms, "OR", limit, filters, params)
+            return hits
+
+    def _fts_search(self, db, terms, operator, limit, filters, params):
+        expression = f" {operator} ".join(terms)
+        # BM25 scores every candidate, so it is only used when the candidate set
+        # is bounded (a rare enough term); otherwise the words are too common to
+        # rank by and the newest matches are returned, which stops early.
+        counts = [db.execute("SELECT COUNT(*) FROM meetings_fts WHERE meetings_fts MATCH ?", (term,)).fetchone()[0]
+                  for term in terms]
+        candidates = min(counts) if operator == "AND" else sum(counts)
+        if not candidates:
+            return []
+        ranked_by_bm25 = candidates <= RANK_LIMIT
+        score = f"bm25(meetings_fts, {', '.join(str(w) for w in WEIGHTS)})" if ranked_by_bm25 else "0.0"
+        order = "score" if ranked_by_bm25 else "f.rowid DESC"
+        join, where = "", ""
+        if filters:
+            join = " JOIN meetings m ON m.id = f.rowid"
+            where = "".join(f" AND {condition}" for condition in filters)
+        ranked = db.execute(
+            f"SELECT f.rowid, {score} AS score FROM meetings_fts f{join}"
+            f" WHERE meetings_fts MATCH ?{where} ORDER BY {order} LIMIT ?", (expression, *params, limit)).fetchall()
+        if not ranked:
+            return []
+        # Snippets are built for the returned rows only.
+        ids = [row[0] for row in ranked]
+        rows = db.execute(
+            f"SELECT f.rowid, m.title, m.meeting_date, m.source, m.name, m.created,"
+            f" snippet(meetings_fts, -1, '**', '**', ' … ', {SNIPPET_TOKENS})"
+            f" FROM meetings_fts f JOIN meetings m ON m.id = f.rowid"
+            f" WHERE meetings_fts MATCH ? AND f.rowid IN ({', '.join('?' * len(ids))})",
+            (expression, *ids)).fetchall()
+        by_id = {row[0]: row for row in rows}
+        return [Hit(*by_id[rowid], score=-score, ranked=ranked_by_bm25) for rowid, score in ranked if rowid in by_id]
+
+    def _substring_search(self, db, query, limit, filters, params):
+        words = [w for w in re.findall(r"\w+", query.lower()) if w not in STOPWORDS] or [query.lower()]
+        conditions = filters + ["(lower(m.title) || ' ' || lower(m.mom) || ' ' || lower(m.transcript)) LIKE ?"] * len(words)
+        rows = db.execute(
+            f"SELECT m.id, m.title, m.meeting_date, m.source, m.name, m.created, '', 0.0 FROM meetings m"
+            f" WHERE {' AND '.join(conditions)} ORDER BY m.meeting_date DESC LIMIT ?",
+            (*params, *[f"%{w}%" for w in words], limit)).fetchall()
+        return [Hit(*row) for row in rows]
+
+    def get(self, meeting_id):
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._conn().execute(
+                "SELECT id, title, meeting_date, source, name, created, mom, transcript, metadata"
+                " FROM meetings WHERE id = ?", (meeting_id,)).fetchone()
+        if row is None:
+            return None
+        return Meeting(*row[:8], metadata=json.loads(row[8]))
+
+    def delete(self, meeting_id):
+        with self._lock:
+            db = self._conn()
+            db.execute("DELETE FROM meetings WHERE id = ?", (meeting_id,))
+            db.commit()
+
+    def sources(self):
+        with self._lock:
+            return [row[0] for row in self._conn().execute("SELECT DISTINCT source FROM meetings ORDER BY source")]
+
+    def optimize(self):
+        """Merge the FTS index segments (worth doing after large imports)."""
+        with self._lock:
+            db = self._conn()
+            if self.fts:
+                db.execute("INSERT INTO meetings_fts(meetings_fts) VALUES ('optimize')")
+                db.commit()
+
+    def stats(self):
+        if not self.enabled:
+            return {"enabled": False, "meetings": 0}
+        with self._lock:
+            count = self._conn().execute("SELECT COUNT(*) FROM meetings").fetchone()[0]
+        return {"enabled": True, "meetings": count, "full_text": bool(self.fts),
+                "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
+
+
+def archive_meeting(transcript, mom, meeting_date=None, source="", name="", metadata=None, archive=None):
+    """Record a finished MOM; archiving problems are logged, never raised."""
+    try:
+        if not isinstance(mom, str):
+            mom = "\n".join(mom)     # the streamed lines of a MOM
+        return (archive or get_default_archive()).add(transcript, mom, meeting_date, source, name, metadata)
+    except Exception as e:
+        print(f"Could not archive the meeting: {e}")
+        return None
+
+
+_default_archive = None
+_default_lock = threading.Lock()
+
+
+def get_default_archive():
+    """Process-wide archive shared by every Streamlit session and the batch CLI."""
+    global _default_archive
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = MeetingArchive()
+        return _default_archive
@@ -0,0 +1,177 @@
+"""In-memory audio ingestion.
+
+Uploaded or recorded bytes are decoded straight into a NumPy int16 buffer
+(WAV sample data is viewed in place, MP3 is piped through ffmpeg), downmixed
+to mono and resampled to the recognizer rate without writing temp files or
+round-tripping through pydub.
+"""
+import shutil
+import struct
+import subprocess
+
+import numpy as np
+
+TARGET_RATE = 16000
+PCM, IEEE_FLOAT, EXTENSIBLE = 1, 3, 0xFFFE
+BLOCK_FRAMES = 1 << 20
+RESAMPLE_BLOCK = 1 << 16
+
+
+# --- WAV ---
+def _wav_chunks(buffer):
+    view = memoryview(buffer)
+    if len(view) < 12 or bytes(view[0:4]) != b"RIFF" or bytes(view[8:12]) != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        size = struct.unpack_from("<I", view, offset + 4)[0]
+        start = offset + 8
+        # Recorders that stream to disk may leave a 0/oversized data length.
+        if chunk_id == b"data" and (size == 0 or start + size > len(view)):
+            size = len(view) - start
+        yield chunk_id, start, size
+        offset = start + size + (size & 1)
+
+
+def read_wav(buffer):
+    """Return (samples, sample_rate, channels); 16-bit data is a zero-copy view."""
+    fmt = data = None
+    for chunk_id, start, size in _wav_chunks(buffer):
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", buffer, start)
+            if fmt[0] == EXTENSIBLE and size >= 40:
+                # The real encoding is the first two bytes of the sub-format GUID.
+                fmt = (struct.unpack_from("<H", buffer, start + 24)[0], *fmt[1:])
+        elif chunk_id == b"data":
+            data = (start, size)
+    if fmt is None or data is None:
+        raise ValueError("WAV file is missing its fmt or data chunk")
+    audio_format, channels, sample_rate, _, block_align, bits = fmt
+    if audio_format not in (PCM, IEEE_FLOAT):
+        raise ValueError(f"Unsupported WAV encoding: {audio_format}")
+    start, size = data
+    frames = size // block_align
+    width = block_align // channels
+    if audio_format == IEEE_FLOAT:
+        if width not in (4, 8):
+            raise ValueError(f"Unsupported float sample width: {width}")
+        raw = np.frombuffer(buffer, dtype="<f4" if width == 4 else "<f8", count=frames * channels, offset=start)
+        samples = (np.clip(raw, -1.0, 1.0) * 32767).astype(np.int16)
+    elif width == 2:
+        samples = np.frombuffer(buffer, dtype="<i2", count=frames * channels, offset=start)
+    elif width == 1:
+        raw = np.frombuffer(buffer, dtype=np.uint8, count=frames * channels, offset=start)
+        samples = (raw.astype(np.int16) - 128) << 8
+    elif width == 3:
+        # 24-bit little-endian: the top two bytes of each sample are its int16 value.
+        raw = np.frombuffer(buffer, dtype=np.uint8, count=frames * channels * 3, offset=start).reshape(-1, 3)
+        samples = np.ascontiguousarray(raw[:, 1:]).view("<i2").reshape(-1)
+    elif width == 4:
+        raw = np.frombuffer(buffer, dtype="<i4", count=frames * channels, offset=start)
+        samples = (raw >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+    return samples.reshape(-1, channels), sample_rate, channels
+
+
+def wav_bytes(samples, sample_rate):
+    """Mono int16 samples as an in-memory 16-bit PCM WAV file."""
+    data = np.asarray(samples, dtype="<i2").tobytes()
+    header = struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + len(data), b"WAVE", b"fmt ", 16, PCM, 1,
+                         sample_rate, sample_rate * 2, 2, 16, b"data", len(data))
+    return header + data
+
+
+# --- Compressed formats ---
+def decode_with_ffmpeg(buffer, sample_rate=TARGET_RATE):
+    """Decode any ffmpeg-readable input to mono int16 at ``sample_rate``."""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg is required to decode compressed audio")
+    result = subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+        input=buffer, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", "replace").strip() or "ffmpeg failed")
+    return np.frombuffer(result.stdout, dtype="<i2")
+
+
+# --- Conversion ---
+def downmix(frames):
+    """Average an (n, channels) int16 array to mono, block by block."""
+    if frames.shape[1] == 1:
+        return frames[:, 0]
+    mono = np.empty(frames.shape[0], dtype=np.int16)
+    for start in range(0, frames.shape[0], BLOCK_FRAMES):
+        block = frames[start:start + BLOCK_FRAMES]
+        mono[start:start + len(block)] = block.mean(axis=1, dtype=np.float32)
+    return mono
+
+
+def resample(samples, source_rate, target_rate=TARGET_RATE):
+    """Linear-interpolation resampler with a box pre-filter when downsampling."""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    ratio = source_rate / target_rate
+    out_len = int(len(samples) / ratio)
+    out = np.empty(out_len, dtype=np.int16)
+    width = int(ratio) if ratio >= 2 else 1
+    # The trailing box average lags by (width - 1) / 2 input samples.
+    lag = (width - 1) / 2
+    for out_start in range(0, out_len, RESAMPLE_BLOCK):
+        out_end = min(out_start + RESAMPLE_BLOCK, out_len)
+        positions = np.arange(out_start, out_end, dtype=np.float64) * ratio + lag
+        lo = max(int(positions[0]) - width + 1, 0)
+        hi = min(int(positions[-1]) + 2, len(samples))
+        block = samples[lo:hi].astype(np.float32)
+        if width > 1:
+            csum = np.cumsum(block, dtype=np.float64)
+            smoothed = np.empty_like(block)
+            smoothed[width:] = csum[width:] - csum[:-width]
+            smoothed[:width] = csum[:width]
+            smoothed[width:] /= width
+            smoothed[:width] /= np.arange(1, min(width, len(block)) + 1)
+            block = smoothed
+        positions -= lo
+        index = np.minimum(positions.astype(np.int64), len(block) - 1)
+        frac = (positions - index).astype(np.float32)
+        following = block[np.minimum(index + 1, len(block) - 1)]
+        out[out_start:out_end] = block[index] + (following - block[index]) * frac
+    return out
+
+
+def decode_audio(data, file_name="", target_rate=TARGET_RATE):
+    """Decode uploaded bytes to (mono int16 samples, sample_rate)."""
+    if file_name.lower().endswith(".wav") or bytes(memoryview(data)[:4]) == b"RIFF":
+        frames, sample_rate, _ = read_wav(data)
+        return resample(downmix(frames), sample_rate, target_rate), target_rate
+    return decode_with_ffmpeg(data, target_rate), target_rate
+
+
+# --- Recognizer source ---
+class ArraySource:
+    """Transcription source over an in-memory mono int16 array."""
+
+    def __init__(self, samples, sample_rate):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.n_frames = len(samples)
+
+    def read(self, start, end):
+        return self.samples[start:end]
+
+    def iter_blocks(self, block_frames):
+        for start in range(0, self.n_frames, block_frames):
+            yield self.samples[start:start + block_frames]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,177 @@
+"""Headless batch processing of recordings and documents.
+
+    python -m noteninja.batch INPUT_DIR OUTPUT_DIR [--processes N] [--threads M]
+
+Every supported file (audio or any registered document type) under INPUT_DIR becomes ``<name>.mom.pdf`` in OUTPUT_DIR.
+Decoding/extraction runs in a process pool (MP3s are decoded in memory, nothing
+is left on disk), transcription and Gemini calls in a thread pool. ``manifest.json`` in OUTPUT_DIR records the outcome of every
+input; finished inputs whose content hash is unchanged are skipped on rerun.
+Every generated MOM is also added to the searchable archive (noteninja.archive).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from noteninja import pipeline
+from noteninja.archive import archive_meeting
+from noteninja.audio_io import decode_audio, wav_bytes
+from noteninja.cache import ResultCache
+from noteninja.extractors import extract_document, supported_extensions
+from noteninja.pdf_extract import extract_normalized_text
+
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+DOCUMENT_EXTENSIONS = tuple("." + extension for extension in supported_extensions())
+MANIFEST_NAME = "manifest.json"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_inputs(input_dir, skip_dir=None):
+    """Supported files under ``input_dir``, leaving out ``skip_dir`` (the output directory)."""
+    skip = os.path.realpath(skip_dir) if skip_dir else None
+    for root, dirs, files in os.walk(input_dir):
+        # Otherwise a rerun with the output inside the input picks up its own PDFs.
+        dirs[:] = sorted(d for d in dirs if os.path.realpath(os.path.join(root, d)) != skip)
+        for name in sorted(files):
+            if name.lower().endswith(AUDIO_EXTENSIONS + DOCUMENT_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+# --- Manifest ---
+class Manifest:
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def is_done(self, name, digest, output_dir):
+        entry = self.entries.get(name)
+        return (entry is not None and entry.get("status") == "done" and entry.get("sha256") == digest
+                and os.path.exists(os.path.join(output_dir, entry["pdf"])))
+
+    def record(self, name, entry):
+        with self._lock:
+            self.entries[name] = entry
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+# --- Stages ---
+def prepare_input(path):
+    """CPU stage (runs in a worker process): decode audio or extract text."""
+    lower = path.lower()
+    if lower.endswith(".mp3"):
+        # Decode errors propagate so the manifest records the real cause.
+        with open(path, "rb") as f:
+            samples, sample_rate = decode_audio(f.read(), path)
+        return {"kind": "audio", "wav_bytes": wav_bytes(samples, sample_rate)}
+    if lower.endswith(".wav"):
+        return {"kind": "audio", "wav": path}
+    if lower.endswith(".pdf"):
+        # Already inside a worker process, so extract pages sequentially here.
+        return {"kind": "document", "text": extract_normalized_text(path, workers=1)}
+    with open(path, "rb") as f:
+        return {"kind": "document", "text": extract_document(f.read(), path)}
+
+
+def finish_input(prepared, model, cache, speakers=False, name=""):
+    """Network stage (runs in a thread): transcribe, summarise, archive and render."""
+    if prepared["kind"] == "audio":
+        if "wav_bytes" in prepared:
+            transcript = pipeline.transcribe_audio_bytes(prepared["wav_bytes"], "decoded.wav", cache, diarize=speakers)
+        else:
+            transcript = pipeline.transcribe_audio(prepared["wav"], cache, diarize=speakers)
+        if not transcript or transcript in pipeline.TRANSCRIPTION_ERRORS:
+            raise RuntimeError(transcript or "No transcript found.")
+        prepare, render = pipeline.prepare_mom_prompt_audio, pipeline.generate_pdf_from_string_audio
+    else:
+        transcript = prepared["text"]
+        prepare, render = pipeline.prepare_mom_prompt_files, pipeline.generate_pdf_from_string_files
+    result = pipeline.generate_mom(transcript, prepare, model, cache)
+    archive_meeting(transcript, result, pipeline.extract_meeting_date(transcript), "batch", name,
+                    {"speakers": bool(speakers)} if prepared["kind"] == "audio" else None)
+    return render(result)
+
+
+def run_batch(input_dir, output_dir, model, processes=None, threads=4, cache=None, force=False, speakers=False):
+    """Process every input under ``input_dir``; returns the manifest entries."""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = Manifest(output_dir)
+
+    todo = []
+    for path in find_inputs(input_dir, output_dir):
+        name = os.path.relpath(path, input_dir)
+        digest = file_digest(path)
+        if not force and manifest.is_done(name, digest, output_dir):
+            print(f"Skipping {name} (already done)")
+            continue
+        todo.append((path, name, digest))
+
+    def network_stage(prepare_future, path, name, digest, started):
+        pdf_name = name.replace(os.sep, "__") + ".mom.pdf"
+        try:
+            pdf_bytes = finish_input(prepare_future.result(), model, cache, speakers, name)
+            with open(os.path.join(output_dir, pdf_name), "wb") as f:
+                f.write(pdf_bytes)
+            entry = {"status": "done", "pdf": pdf_name}
+        except Exception as e:
+            entry = {"status": "failed", "error": str(e)}
+        entry.update({"sha256": digest, "seconds": round(time.monotonic() - started, 3),
+                      "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        manifest.record(name, entry)
+        print(f"{entry['status']:>6}  {name}")
+        return entry
+
+    with ProcessPoolExecutor(max_workers=processes) as cpu_pool, ThreadPoolExecutor(max_workers=threads) as io_pool:
+        futures = []
+        for path, name, digest in todo:
+            started = time.monotonic()
+            prepared = cpu_pool.submit(prepare_input, path)
+            futures.append(io_pool.submit(network_stage, prepared, path, name, digest, started))
+        for future in as_completed(futures):
+            future.result()
+    return manifest.entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate MOM PDFs for a directory of recordings and documents.")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--processes", type=int, default=None, help="decode/extract worker processes (default: CPU count)")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent transcription/Gemini calls")
+    parser.add_argument("--api-key", default=os.environ.get("GOOGLE_API_KEY"), help="defaults to $GOOGLE_API_KEY")
+    parser.add_argument("--model", default=pipeline.MODEL_NAME)
+    parser.add_argument("--rpm", type=float, default=None, help="Gemini requests per minute (default: $NOTENINJA_GEMINI_RPM or unlimited)")
+    parser.add_argument("--speakers", action="store_true", help="label the transcript by speaker before summarising")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the result cache")
+    parser.add_argument("--force", action="store_true", help="reprocess inputs already marked done")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("a Gemini API key is required (--api-key or GOOGLE_API_KEY)")
+    model = pipeline.configure_model(args.api_key, args.model, rpm=args.rpm)
+    cache = None if args.no_cache else ResultCache()
+    entries = run_batch(args.input_dir, args.output_dir, model, args.processes, args.threads, cache, args.force, args.speakers)
+    failed = [name for name, entry in entries.items() if entry["status"] != "done"]
+    print(f"{len(entries) - len(failed)} done, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""Content-addressed cache for transcripts and generated minutes.
+
+Keys are SHA-256 digests of the input bytes (audio, PDF or prompt) plus the
+model name, so the same upload is never transcribed or summarised twice. A
+small in-process LRU sits in front of an SQLite store that is evicted by total
+size and age. Set ``NOTENINJA_CACHE=off`` (or pass ``enabled=False``) to opt out.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- Defaults ---
+CACHE_PATH = os.environ.get("NOTENINJA_CACHE_PATH", os.path.join(".cache", "noteninja.sqlite3"))
+MAX_BYTES = 256 * 1024 * 1024
+TTL_S = 30 * 24 * 3600
+MEMORY_ITEMS = 128
+HASH_BLOCK = 1024 * 1024
+
+
+# --- Keys ---
+def make_key(kind, model, *parts):
+    """Digest of ``kind``, ``model`` and each part (str, bytes or readable file)."""
+    digest = hashlib.sha256()
+    for part in (kind, model, *parts):
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        if isinstance(part, (bytes, bytearray, memoryview)):
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        else:
+            _update_from_file(digest, part)
+    return digest.hexdigest()
+
+
+def _update_from_file(digest, source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            _update_from_file(digest, f)
+        return
+    position = source.tell() if hasattr(source, "tell") else None
+    if hasattr(source, "seek"):
+        source.seek(0)
+    while True:
+        block = source.read(HASH_BLOCK)
+        if not block:
+            break
+        digest.update(block)
+    if position is not None:
+        source.seek(position)
+
+
+# --- Cache ---
+class ResultCache:
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES, ttl_s=TTL_S,
+                 memory_items=MEMORY_ITEMS, enabled=None):
+        if enabled is None:
+            enabled = os.environ.get("NOTENINJA_CACHE", "on").lower() not in ("0", "off", "false", "no")
+        self.enabled = enabled
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+        return self._db
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            db = self._conn()
+            row = db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_s:
+                if row is not None:
+                    db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    db.commit()
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            db.commit()
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._remember(key, value)
+            db = self._conn()
+            db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", (key, value, size, now, now))
+            self._evict(db, now)
+            db.commit()
+
+    def _evict(self, db, now):
+        expired = db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl_s,)).rowcount
+        self.evictions += max(expired, 0)
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            self.evictions += 1
+            total -= size
+
+    def get_or_compute(self, key, compute, should_store=None):
+        """Return the cached value, or compute and store it.
+
+        ``should_store(value)`` can veto caching, e.g. for error messages.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute()
+        if value is not None and (should_store is None or should_store(value)):
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.enabled:
+                self._conn().execute("DELETE FROM results")
+                self._conn().commit()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_items": len(self._memory),
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Process-wide cache shared by every Streamlit session and rerun."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
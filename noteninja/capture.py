@@ -0,0 +1,331 @@
+"""Streaming capture of system audio to disk.
+
+The sounddevice thread converts each raw chunk to the capture profile
+(downmix and resample, e.g. 44.1 kHz stereo -> 16 kHz mono) and pushes it
+into a bounded ring buffer; a writer thread drains it into WAV files,
+rotating to a new segment file every ``segment_s`` seconds so finished
+segments can be transcribed while the recording is still going. Profiles
+with FLAC/Opus encoding compress each finished segment with ffmpeg.
+"""
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+# --- Defaults ---
+RING_CAPACITY = 512        # chunks (~12 s of audio at 1024 device frames)
+PUSH_TIMEOUT_S = 0.05      # how long the producer waits before dropping
+SEGMENT_S = 60.0
+
+
+# --- Capture Profiles ---
+@dataclass(frozen=True)
+class CaptureProfile:
+    name: str
+    sample_rate: int = None     # None keeps the device rate
+    channels: int = None        # None keeps the device channels; 1 downmixes
+    encoding: str = "wav"       # "wav", "flac" or "opus"
+    bitrate: str = "24k"        # Opus only
+
+
+PROFILES = {
+    "speech": CaptureProfile("speech", 16000, 1),
+    "speech-flac": CaptureProfile("speech-flac", 16000, 1, "flac"),
+    "speech-opus": CaptureProfile("speech-opus", 16000, 1, "opus"),
+    "device": CaptureProfile("device"),
+}
+DEFAULT_PROFILE = "speech"
+
+CODECS = {"flac": (".flac", ["-c:a", "flac"]), "opus": (".opus", ["-c:a", "libopus", "-application", "voip"])}
+
+
+def get_profile(name=None):
+    """Profile ``name``, or ``$NOTENINJA_CAPTURE_PROFILE`` (default "speech")."""
+    name = name or os.environ.get("NOTENINJA_CAPTURE_PROFILE", DEFAULT_PROFILE)
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown capture profile {name!r} (choose from {', '.join(PROFILES)})") from None
+
+
+class ChunkConverter:
+    """Downmixes and resamples interleaved int16 chunks to a profile, keeping
+    the filter state between chunks so segment boundaries are seamless.
+
+    Same filter as ``audio_io.resample``: a box average over ``int(ratio)``
+    input samples, then linear interpolation.
+    """
+
+    def __init__(self, channels, sample_rate, profile):
+        self.in_channels = channels
+        self.out_channels = profile.channels or channels
+        self.in_rate = sample_rate
+        self.out_rate = profile.sample_rate or sample_rate
+        self.passthrough = self.out_channels == channels and self.out_rate == sample_rate
+        self.ratio = sample_rate / self.out_rate
+        self.width = int(self.ratio) if self.ratio >= 2 else 1
+        self._raw_tail = np.zeros((0, self.out_channels), np.float32)  # last width - 1 inputs
+        self._smooth = np.zeros((0, self.out_channels), np.float32)    # filtered, not yet consumed
+        self._base = 0              # input index of _smooth[0]
+        self._next = 0              # index of the next output sample
+
+    def convert(self, chunk):
+        if self.passthrough:
+            return chunk
+        frames = np.frombuffer(chunk, dtype="<i2").reshape(-1, self.in_channels)
+        if self.out_channels == 1 and self.in_channels > 1:
+            frames = frames.mean(axis=1, dtype=np.float32, keepdims=True)
+        frames = frames.astype(np.float32, copy=False)
+        if self.out_rate == self.in_rate:
+            return np.rint(frames).astype("<i2").tobytes()
+        return self._resample(frames).tobytes()
+
+    def _resample(self, frames):
+        width = self.width
+        if width > 1:
+            extended = np.concatenate((self._raw_tail, frames))
+            csum = np.concatenate((np.zeros((1, self.out_channels)), np.cumsum(extended, axis=0, dtype=np.float64)))
+            ends = np.arange(len(self._raw_tail) + 1, len(extended) + 1)
+            starts = np.maximum(ends - width, 0)
+            # Before the first full window the average covers what is there.
+            frames = ((csum[ends] - csum[starts]) / (ends - starts)[:, None]).astype(np.float32)
+            self._raw_tail = extended[len(extended) - (width - 1):]
+        smooth = np.concatenate((self._smooth, frames))
+        lag = (width - 1) / 2
+        available = self._base + len(smooth) - 1          # last index usable as the right neighbour
+        count = max(0, int(np.floor((available - lag) / self.ratio - self._next)) + 1)
+        positions = (self._next + np.arange(count, dtype=np.float64)) * self.ratio + lag
+        positions = positions[positions < available]
+        index = positions.astype(np.int64)
+        frac = (positions - index).astype(np.float32)[:, None]
+        local = index - self._base
+        out = smooth[local] + (smooth[local + 1] - smooth[local]) * frac
+        self._next += len(positions)
+        keep = int(self._next * self.ratio + lag) - self._base
+        self._smooth = smooth[max(0, min(keep, len(smooth))):]
+        self._base += len(smooth) - len(self._smooth)
+        return np.rint(out).astype("<i2")
+
+
+def compress_segment(path, profile):
+    """Re-encode a finished WAV segment per ``profile.encoding`` and delete the WAV.
+
+    Returns the new path, or ``path`` unchanged when the profile stores WAV or
+    ffmpeg is unavailable.
+    """
+    if profile.encoding == "wav":
+        return path
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        print(f"ffmpeg not found; keeping {os.path.basename(path)} as WAV")
+        return path
+    suffix, codec = CODECS[profile.encoding]
+    if profile.encoding == "opus":
+        codec = codec + ["-b:a", profile.bitrate]
+    target = os.path.splitext(path)[0] + suffix
+    result = subprocess.run([ffmpeg, "-hide_banner", "-loglevel", "error", "-y", "-i", path, *codec, target],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        print(f"Could not compress {os.path.basename(path)}: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return path
+    os.remove(path)
+    return target
+
+
+# --- Ring Buffer ---
+class RingBuffer:
+    """Bounded FIFO of audio chunks with backpressure and overflow counting.
+
+    ``push`` waits up to ``timeout`` for room; if the consumer is still behind,
+    the oldest chunk is discarded so the capture thread never stalls.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY, timeout=PUSH_TIMEOUT_S):
+        self.capacity = capacity
+        self.timeout = timeout
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.pushed = 0
+        self.dropped = 0
+        self.waits = 0
+        self.high_water = 0
+
+    def push(self, chunk):
+        with self._cond:
+            if len(self._items) >= self.capacity:
+                self.waits += 1
+                self._cond.wait_for(lambda: len(self._items) < self.capacity, self.timeout)
+                if len(self._items) >= self.capacity:
+                    self._items.popleft()
+                    self.dropped += 1
+            self._items.append(chunk)
+            self.pushed += 1
+            self.high_water = max(self.high_water, len(self._items))
+            self._cond.notify_all()
+
+    def pop(self, timeout=None):
+        """Next chunk, or None once the buffer is closed and drained."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            chunk = self._items.popleft()
+            self._cond.notify_all()
+            return chunk
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+# --- Segment Writer ---
+class SegmentedWavWriter:
+    """Appends PCM chunks to numbered WAV files of at most ``segment_s`` seconds.
+
+    Set ``segment_s`` to None to write a single file.
+    """
+
+    def __init__(self, directory, channels, sample_rate, sample_width=2,
+                 segment_s=SEGMENT_S, prefix="segment", on_segment=None):
+        self.directory = directory
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.prefix = prefix
+        self.on_segment = on_segment
+        self.segment_frames = int(segment_s * sample_rate) if segment_s else None
+        self.frame_bytes = channels * sample_width
+        self.segments = []
+        self.bytes_written = 0
+        self._wav = None
+        self._path = None
+        self._frames = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        self._path = os.path.join(self.directory, f"{self.prefix}_{len(self.segments):04d}.wav")
+        self._wav = wave.open(self._path, "wb")
+        self._wav.setnchannels(self.channels)
+        self._wav.setsampwidth(self.sample_width)
+        self._wav.setframerate(self.sample_rate)
+        self._frames = 0
+
+    def _finish(self):
+        if self._wav is None:
+            return
+        self._wav.close()
+        self._wav = None
+        self.segments.append(self._path)
+        if self.on_segment:
+            self.on_segment(self._path)
+
+    def write(self, chunk):
+        view = memoryview(chunk).cast("B")
+        while len(view):
+            if self._wav is None:
+                self._open()
+            if self.segment_frames is None:
+                take = len(view)
+            else:
+                take = min(len(view), (self.segment_frames - self._frames) * self.frame_bytes)
+            self._wav.writeframes(view[:take])
+            self._frames += take // self.frame_bytes
+            self.bytes_written += take
+            view = view[take:]
+            if self.segment_frames is not None and self._frames >= self.segment_frames:
+                self._finish()
+
+    def close(self):
+        self._finish()
+        return self.segments
+
+
+# --- Recorder ---
+class StreamingRecorder:
+    """Ring buffer plus a background thread that streams it to segment files.
+
+    ``channels`` and ``sample_rate`` describe the device stream; chunks are
+    converted to ``profile`` (default: unchanged) in ``push``, so the ring
+    buffer and files hold profile-rate audio and the WAV headers say so.
+    Finished segment paths are announced on ``finished`` (a ``queue.Queue``)
+    and through the optional ``on_segment`` callback.
+    """
+
+    def __init__(self, directory, channels, sample_rate, sample_width=2,
+                 segment_s=SEGMENT_S, capacity=RING_CAPACITY, on_segment=None, profile=None):
+        self.profile = profile or PROFILES["device"]
+        self.converter = ChunkConverter(channels, sample_rate, self.profile)
+        self.buffer = RingBuffer(capacity)
+        self.finished = queue.Queue()
+        self.segments = []          # final paths (compressed when the profile says so)
+        self._on_segment = on_segment
+        self.writer = SegmentedWavWriter(directory, self.converter.out_channels, self.converter.out_rate,
+                                         sample_width, segment_s=segment_s, on_segment=self._segment_done)
+        self.device_overflows = 0
+        self.bytes_captured = 0
+        self.bytes_stored = 0
+        self.started_at = None
+        self._thread = None
+
+    def _segment_done(self, path):
+        size = os.path.getsize(path)
+        path = compress_segment(path, self.profile)
+        self.bytes_stored += os.path.getsize(path) if os.path.exists(path) else size
+        self.segments.append(path)
+        self.finished.put(path)
+        if self._on_segment:
+            self._on_segment(path)
+
+    def _drain(self):
+        while True:
+            chunk = self.buffer.pop()
+            if chunk is None:
+                break
+            self.writer.write(chunk)
+        self.writer.close()
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+        return self
+
+    def push(self, chunk, overflowed=False):
+        if overflowed:
+            self.device_overflows += 1
+        self.bytes_captured += len(chunk)
+        self.buffer.push(self.converter.convert(chunk))
+
+    def stop(self):
+        """Flush everything to disk and return the list of segment files."""
+        self.buffer.close()
+        if self._thread:
+            self._thread.join()
+        return list(self.segments)
+
+    def stats(self):
+        return {
+            "profile": self.profile.name,
+            "chunks": self.buffer.pushed,
+            "dropped_chunks": self.buffer.dropped,
+            "backpressure_waits": self.buffer.waits,
+            "buffer_high_water": self.buffer.high_water,
+            "device_overflows": self.device_overflows,
+            "bytes_captured": self.bytes_captured,
+            "bytes_written": self.writer.bytes_written,
+            "bytes_stored": self.bytes_stored,
+            "segments": len(self.segments),
+            "elapsed_s": time.monotonic() - self.started_at if self.started_at else 0.0,
+        }
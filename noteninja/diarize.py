@@ -0,0 +1,311 @@
+"""CPU speaker diarization from MFCC statistics.
+
+Speech is cut into overlapping windows (1.5 s every 0.75 s). Each window is
+summarised as the mean and standard deviation of its MFCCs (24 float32
+values), computed a block of windows at a time with NumPy. Windows are
+clustered online: a window joins the most similar speaker centroid (cosine
+similarity after standardising with the running mean and variance of all
+windows) or starts a new speaker, up to ``MAX_SPEAKERS``. Nothing per window
+is kept, so memory is bounded by the block size and the number of speakers,
+and the pass is linear in duration. The output is a list of speaker turns.
+"""
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+# --- Defaults ---
+WINDOW_S = 1.5
+HOP_S = 0.75
+FRAME_MS = 25
+FRAME_HOP_MS = 10
+N_MELS = 26
+N_MFCC = 13                 # c0 (loudness) is dropped from the embedding
+GATE_DB = 15                # frames this far below the loud ones are ignored
+MIN_VOICED = 0.5            # windows with fewer voiced frames are skipped
+BLOCK_WINDOWS = 80          # windows analysed per read (~60 s of audio)
+SIMILARITY = 0.2            # cosine similarity needed to join a speaker
+MERGE_SIMILARITY = 0.4      # speakers this similar are merged
+EMBEDDING_DIMS = 2 * (N_MFCC - 1)
+MAX_SPEAKERS = 8
+WARMUP_WINDOWS = 20         # windows observed before the first is assigned (~15 s)
+MIN_TURN_S = 1.0            # shorter turns are merged into a neighbour
+MERGE_GAP_S = 1.0           # same-speaker turns closer than this are joined
+
+
+@dataclass
+class Turn:
+    speaker: int            # 0-based, numbered by first appearance
+    start: int              # first sample (inclusive)
+    end: int                # last sample (exclusive)
+
+    @property
+    def label(self):
+        return f"Speaker {self.speaker + 1}"
+
+
+# --- Features ---
+@lru_cache(maxsize=8)
+def _filters(sample_rate, n_fft):
+    """Mel filterbank (N_MELS x bins) and DCT-II matrix, float32."""
+    def mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def hz(m):
+        return 700.0 * (10 ** (m / 2595.0) - 1.0)
+
+    edges = hz(np.linspace(mel(60.0), mel(min(8000.0, sample_rate / 2)), N_MELS + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, centre, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    bank = np.maximum(0.0, np.minimum((bins - lower) / (centre - lower), (upper - bins) / (upper - centre)))
+    n = np.arange(N_MELS)
+    dct = np.cos(np.pi / N_MELS * (n[None, :] + 0.5) * np.arange(N_MFCC)[:, None])
+    return bank.astype(np.float32), dct.astype(np.float32)
+
+
+def mfcc(samples, sample_rate):
+    """MFCCs (frames x N_MFCC, float32) of int16 ``samples``; 25 ms frames every 10 ms."""
+    frame_len = sample_rate * FRAME_MS // 1000
+    hop = sample_rate * FRAME_HOP_MS // 1000
+    if len(samples) < frame_len:
+        return np.zeros((0, N_MFCC), np.float32)
+    n_fft = 1 << (frame_len - 1).bit_length()
+    signal = samples.astype(np.float32) / 32768.0
+    signal[1:] -= 0.97 * signal[:-1]
+    frames = np.lib.stride_tricks.sliding_window_view(signal, frame_len)[::hop]
+    frames = frames * np.hamming(frame_len).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, n_fft)).astype(np.float32) ** 2
+    bank, dct = _filters(sample_rate, n_fft)
+    return np.log(power @ bank.T + 1e-8) @ dct.T
+
+
+def window_embeddings(source, start, end, window_s=WINDOW_S, hop_s=HOP_S, block_windows=BLOCK_WINDOWS):
+    """Yield (window_start, window_end, embedding) for windows of [start, end)."""
+    rate = source.sample_rate
+    window, hop = int(window_s * rate), int(hop_s * rate)
+    frame_len = rate * FRAME_MS // 1000
+    frame_hop = rate * FRAME_HOP_MS // 1000
+    starts = range(start, max(start + 1, end - window // 2), hop)
+    for first in range(0, len(starts), block_windows):
+        block = starts[first:first + block_windows]
+        block_start, block_end = block[0], min(block[-1] + window, end)
+        coeffs = mfcc(source.read(block_start, block_end), rate)
+        if not len(coeffs):
+            continue
+        # Only frames within GATE_DB of the block's loud frames describe a voice;
+        # pauses and breaths at turn edges would otherwise form a "speaker".
+        c0 = coeffs[:, 0]
+        voiced = c0 >= np.percentile(c0, 95) - N_MELS * np.log(10 ** (GATE_DB / 10))
+        coeffs = coeffs[:, 1:] * voiced[:, None]
+        zero = np.zeros((1, coeffs.shape[1]), np.float64)
+        sums = np.concatenate((zero, np.cumsum(coeffs, axis=0, dtype=np.float64)))
+        squares = np.concatenate((zero, np.cumsum(np.square(coeffs, dtype=np.float64), axis=0)))
+        counts = np.concatenate(([0], np.cumsum(voiced)))
+        for w_start in block:
+            w_end = min(w_start + window, end)
+            lo = (w_start - block_start) // frame_hop
+            hi = min(max(lo + 1, (w_end - block_start - frame_len) // frame_hop + 1), len(coeffs))
+            count = counts[hi] - counts[lo] if hi > lo else 0
+            if count < MIN_VOICED * (hi - lo) or count == 0:
+                continue
+            mean = (sums[hi] - sums[lo]) / count
+            std = np.sqrt(np.maximum((squares[hi] - squares[lo]) / count - mean * mean, 0.0))
+            yield w_start, w_end, np.concatenate((mean, std)).astype(np.float32)
+
+
+# --- Online clustering ---
+class OnlineClusterer:
+    """Assigns embeddings to speakers as they arrive (O(speakers) memory).
+
+    Speaker ids are stable: when two centroids merge, the newer id becomes an
+    alias of the older one (see ``resolve``). Numbers handed out by ``number``
+    are never reused or shifted by later merges.
+    """
+
+    def __init__(self, similarity=SIMILARITY, merge_similarity=MERGE_SIMILARITY, max_speakers=MAX_SPEAKERS):
+        self.similarity = similarity
+        self.merge_similarity = merge_similarity
+        self.max_speakers = max_speakers
+        self.centroids = np.zeros((0, EMBEDDING_DIMS), np.float32)
+        self.counts = np.zeros(0, np.int64)
+        self._ids = []              # speaker id of each centroid row
+        self._aliases = {}          # merged id -> surviving id
+        self._numbers = {}          # surviving id -> label number, in order of first use
+        self._next_id = 0
+        self._mean = np.zeros(EMBEDDING_DIMS, np.float64)   # running mean / squared deviations of all windows
+        self._m2 = np.zeros(EMBEDDING_DIMS, np.float64)
+        self._seen = 0
+        self._lock = threading.Lock()
+
+    @property
+    def n_speakers(self):
+        return len(self._ids)
+
+    @property
+    def warm(self):
+        return self._seen >= WARMUP_WINDOWS
+
+    def observe(self, embedding):
+        """Update the normalisation statistics; call for every window before ``assign``."""
+        with self._lock:
+            self._seen += 1
+            delta = embedding - self._mean
+            self._mean += delta / self._seen
+            self._m2 += delta * (embedding - self._mean)
+
+    def assign(self, embedding):
+        """Return the speaker id for ``embedding`` and update its centroid."""
+        with self._lock:
+            scale = np.sqrt(self._m2 / max(self._seen, 1)) + 1e-3
+            scores = self._scores(embedding, scale)
+            best = int(np.argmax(scores)) if len(scores) else -1
+            if best < 0 or (scores[best] < self.similarity and self.n_speakers < self.max_speakers):
+                self.centroids = np.vstack((self.centroids, embedding[None, :]))
+                self.counts = np.append(self.counts, 1)
+                self._ids.append(self._next_id)
+                self._next_id += 1
+                return self._ids[-1]
+            self.counts[best] += 1
+            self.centroids[best] += (embedding - self.centroids[best]) / self.counts[best]
+            return self._ids[self._maybe_merge(best, scale)]
+
+    def consolidate(self):
+        """Merge speakers that became similar once all statistics settled."""
+        with self._lock:
+            scale = np.sqrt(self._m2 / max(self._seen, 1)) + 1e-3
+            row = 0
+            while row < self.n_speakers:
+                merged = self._maybe_merge(row, scale)
+                row = row + 1 if merged == row else 0
+
+    def resolve(self, speaker):
+        while speaker in self._aliases:
+            speaker = self._aliases[speaker]
+        return speaker
+
+    def number(self, speaker):
+        """0-based label number of ``speaker``, fixed the first time it is asked for."""
+        with self._lock:
+            speaker = self.resolve(speaker)
+            if speaker not in self._numbers:
+                self._numbers[speaker] = len(self._numbers)
+            return self._numbers[speaker]
+
+    def _scores(self, vector, scale):
+        # Cosine similarity in standardised space so no coefficient dominates.
+        centred = (self.centroids - self._mean) / scale
+        query = (vector - self._mean) / scale
+        norms = np.linalg.norm(centred, axis=1) * (np.linalg.norm(query) or 1.0)
+        return centred @ query / np.maximum(norms, 1e-9)
+
+    def _maybe_merge(self, row, scale):
+        # A centroid seeded by one window can split a voice in two; fold it into
+        # the other one once the two have drifted together.
+        scores = self._scores(self.centroids[row], scale)
+        scores[row] = -np.inf
+        other = int(np.argmax(scores))
+        if scores[other] < self.merge_similarity:
+            return row
+        keep, drop = sorted((row, other), key=lambda i: self._ids[i])
+        total = self.counts[keep] + self.counts[drop]
+        self.centroids[keep] = (self.centroids[keep] * self.counts[keep]
+                                + self.centroids[drop] * self.counts[drop]) / total
+        self.counts[keep] = total
+        self._aliases[self._ids[drop]] = self._ids[keep]
+        self.centroids = np.delete(self.centroids, drop, axis=0)
+        self.counts = np.delete(self.counts, drop)
+        del self._ids[drop]
+        return keep if keep < drop else keep - 1
+
+
+# --- Turns ---
+def smooth_turns(turns, sample_rate, min_turn_s=MIN_TURN_S, merge_gap_s=MERGE_GAP_S):
+    """Merge blips into their neighbours and join close same-speaker turns."""
+    min_turn, merge_gap = int(min_turn_s * sample_rate), int(merge_gap_s * sample_rate)
+    result = []
+    for turn in turns:
+        close = result and turn.start - result[-1].end <= merge_gap
+        if close and (result[-1].speaker == turn.speaker or turn.end - turn.start < min_turn):
+            result[-1].end = turn.end
+        elif close and result[-1].end - result[-1].start < min_turn:
+            # A leading blip takes the following speaker.
+            result[-1] = Turn(turn.speaker, result[-1].start, turn.end)
+        else:
+            result.append(Turn(turn.speaker, turn.start, turn.end))
+    return result
+
+
+class Diarizer:
+    """Speaker turns for a recording. Reusing one instance for consecutive
+    segments of the same recording keeps speaker numbers consistent."""
+
+    def __init__(self, clusterer=None, **options):
+        self.clusterer = clusterer or OnlineClusterer()
+        self.options = options
+
+    def turns(self, source, regions=None):
+        """Return smoothed ``Turn``s covering ``regions`` (default: the whole source)."""
+        if regions is None:
+            regions = [(0, source.n_frames)]
+        hop = int(self.options.get("hop_s", HOP_S) * source.sample_rate)
+        raw = []                    # [speaker id, start, end] per stretch of one speaker
+        last_region = None
+        for region, w_start, w_end, speaker in self._labelled(source, regions):
+            # Each window decides the hop-long stretch around its centre.
+            boundary = max(region[0], (w_start + w_end) // 2 - hop // 2)
+            if region != last_region:
+                raw.append([speaker, region[0], region[1]])
+                last_region = region
+            elif speaker != raw[-1][0]:
+                raw[-1][2] = boundary
+                raw.append([speaker, boundary, region[1]])
+        self.clusterer.consolidate()
+        # Regions too short for a window belong to whoever spoke just before.
+        covered = {start for _, start, _ in raw}
+        raw.extend([None, start, end] for start, end in regions if start not in covered)
+        raw.sort(key=lambda item: item[1])
+        turns, previous = [], None
+        for speaker, start, end in raw:
+            if speaker is None:
+                speaker = previous if previous is not None else next((s for s, _, _ in raw if s is not None), 0)
+            previous = speaker
+            turns.append(Turn(self.clusterer.number(speaker), start, end))
+        return smooth_turns(turns, source.sample_rate)
+
+    def _labelled(self, source, regions):
+        """(region, window_start, window_end, speaker id) in order. Until
+        WARMUP_WINDOWS have been seen, windows are held back so the first ones
+        are compared with settled normalisation statistics."""
+        pending = []
+        for region in regions:
+            region = (region[0], region[1])
+            for w_start, w_end, embedding in window_embeddings(source, region[0], region[1], **self.options):
+                self.clusterer.observe(embedding)
+                pending.append((region, w_start, w_end, embedding))
+                if self.clusterer.warm:
+                    for held_region, start, end, held in pending:
+                        yield held_region, start, end, self.clusterer.assign(held)
+                    pending.clear()
+        for held_region, start, end, held in pending:
+            yield held_region, start, end, self.clusterer.assign(held)
+
+
+def diarize(source, regions=None, **options):
+    return Diarizer(**options).turns(source, regions)
+
+
+def format_turns(labelled):
+    """``[(turn, text), ...]`` -> "Speaker 1: ..." lines, one per speaker change."""
+    lines = []
+    previous = None
+    for turn, text in labelled:
+        text = text.strip()
+        if not text:
+            continue
+        if lines and turn.speaker == previous:
+            lines[-1] += " " + text
+        else:
+            lines.append(f"{turn.label}: {text}")
+            previous = turn.speaker
+    return "\n".join(lines)
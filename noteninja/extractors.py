@@ -0,0 +1,183 @@
+"""Pluggable text extractors for uploaded meeting documents.
+
+Each extractor declares the extensions it handles and a rough cost (seconds
+per MB) used to schedule mixed uploads, and streams text lazily as pieces.
+``extract_document`` normalises the stream in one pass and memoizes the
+result per file hash; ``extract_many`` runs several uploads concurrently.
+"""
+import email
+import io
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+
+from noteninja.cache import make_key
+from noteninja.pdf_extract import LineNormalizer, iter_pages
+from noteninja.tracing import span
+
+MAX_WORKERS = 4
+
+
+class Extractor:
+    name = "base"
+    extensions = ()
+    cost_per_mb = 0.01
+
+    def iter_text(self, data):
+        raise NotImplementedError
+
+    def estimated_seconds(self, data):
+        return self.cost_per_mb * len(data) / (1024 * 1024)
+
+
+# --- Registry ---
+_registry = {}
+
+
+def register(extractor):
+    for extension in extractor.extensions:
+        _registry[extension] = extractor
+    return extractor
+
+
+def extractor_for(file_name):
+    return _registry.get(os.path.splitext(file_name)[1].lower())
+
+
+def supported_extensions():
+    return sorted(extension.lstrip(".") for extension in _registry)
+
+
+# --- Built-in extractors ---
+class PdfExtractor(Extractor):
+    name = "pdf"
+    extensions = (".pdf",)
+    cost_per_mb = 2.0
+
+    def iter_text(self, data):
+        for page in iter_pages(data):
+            yield page.text
+
+
+class DocxExtractor(Extractor):
+    name = "docx"
+    extensions = (".docx",)
+    cost_per_mb = 0.5
+
+    def iter_text(self, data):
+        import docx
+        for para in docx.Document(io.BytesIO(data)).paragraphs:
+            yield para.text + "\n"
+
+
+def _decode(data):
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1")
+
+
+class PlainTextExtractor(Extractor):
+    name = "text"
+    extensions = (".txt", ".md")
+    cost_per_mb = 0.01
+
+    def iter_text(self, data):
+        yield from _decode(data).splitlines(keepends=True)
+
+
+_CUE_TIMING_RE = re.compile(r"^\s*(\d{1,2}:)?\d{1,2}:\d{2}[.,]\d{3}\s*-->")
+_CUE_INDEX_RE = re.compile(r"^\s*\d+\s*$")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+class SubtitleExtractor(Extractor):
+    """WebVTT/SRT meeting transcripts: keeps only the spoken text."""
+    name = "subtitles"
+    extensions = (".vtt", ".srt")
+    cost_per_mb = 0.05
+
+    def iter_text(self, data):
+        skipping_block = False
+        for line in _decode(data).splitlines():
+            stripped = line.strip()
+            if not stripped:
+                skipping_block = False
+                continue
+            if stripped.startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+                skipping_block = True
+                continue
+            if skipping_block or _CUE_INDEX_RE.match(stripped) or _CUE_TIMING_RE.match(stripped):
+                continue
+            # "<v Alice>Hello" voice spans become "Alice: Hello".
+            stripped = re.sub(r"<v(?:\.[^ >]*)?\s+([^>]+)>", r"\1: ", stripped)
+            yield _TAG_RE.sub("", stripped) + "\n"
+
+
+class EmailExtractor(Extractor):
+    """Plain-text email exports (.eml): headers plus text parts."""
+    name = "email"
+    extensions = (".eml",)
+    cost_per_mb = 0.1
+
+    def iter_text(self, data):
+        message = email.message_from_bytes(data, policy=policy.default)
+        for header in ("Subject", "From", "To", "Date"):
+            if message[header]:
+                yield f"{header}: {message[header]}\n"
+        for part in message.walk():
+            if part.get_content_type() == "text/plain" and not part.is_attachment():
+                yield part.get_content()
+                yield "\n"
+
+
+for _extractor in (PdfExtractor(), DocxExtractor(), PlainTextExtractor(), SubtitleExtractor(), EmailExtractor()):
+    register(_extractor)
+
+
+# --- Extraction ---
+def extract_document(data, file_name, cache=None):
+    """Normalised text of one upload; memoized per file hash when ``cache`` is given."""
+    extractor = extractor_for(file_name)
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: {file_name}")
+
+    def compute():
+        normalizer = LineNormalizer()
+        for piece in extractor.iter_text(data):
+            normalizer.feed(piece)
+        return normalizer.finish()
+
+    with span("extract", extractor=extractor.name, bytes_in=len(data)) as active:
+        if cache is None:
+            text = compute()
+        else:
+            key = make_key("extract", extractor.name, data)
+            text = cache.get(key)
+            active.set(cache_hit=text is not None)
+            if text is None:
+                text = compute()
+                cache.set(key, text)
+        active.set(bytes_out=len(text))
+        return text
+
+
+def extract_many(files, cache=None, max_workers=MAX_WORKERS):
+    """Extract ``[(file_name, data), ...]`` concurrently; results keep input order.
+
+    The most expensive files are started first so they do not finish last.
+    """
+    for file_name, _ in files:
+        if extractor_for(file_name) is None:
+            raise ValueError(f"Unsupported file type: {file_name}")
+    order = sorted(range(len(files)), reverse=True,
+                   key=lambda i: extractor_for(files[i][0]).estimated_seconds(files[i][1]))
+    results = [None] * len(files)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(extract_document, files[i][1], files[i][0], cache): i for i in order}
+        for future, index in futures.items():
+            results[index] = future.result()
+    return results
@@ -0,0 +1,536 @@
+"""Gemini client: rate limiting, retries, deadlines and hedged requests.
+
+``GeminiClient`` wraps a transport (``RestTransport`` talks to the REST API
+over reused keep-alive connections; ``SdkTransport`` adapts a
+``google.generativeai`` model or any object with ``generate_content``).
+Every call waits for the request/token buckets, runs under a deadline,
+retries transient failures with jittered exponential backoff (honouring
+``Retry-After`` on 429s, which also pauses the bucket for every caller) and
+can send a second, hedged request when the first is slower than
+``hedge_after`` seconds. Failures raise ``ModelError`` subclasses instead of
+returning "Error: ..." strings. Point ``base_url`` (or ``NOTENINJA_GEMINI_URL``)
+at a local fake server to exercise all of this offline.
+"""
+import asyncio
+import contextvars
+import email.utils
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from noteninja.summarize import estimate_tokens
+from noteninja.tracing import span
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+API_VERSION = "v1beta"
+TIMEOUT_S = 120.0
+MAX_ATTEMPTS = 5
+BASE_DELAY_S = 0.5
+MAX_DELAY_S = 30.0
+MAX_WORKERS = 16
+
+
+# --- Errors ---
+class ModelError(Exception):
+    """A Gemini request failed; ``retryable`` says whether trying again may help."""
+    retryable = False
+
+
+class RateLimitError(ModelError):
+    retryable = True
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TransientError(ModelError):
+    """Server errors, dropped connections and per-attempt timeouts."""
+    retryable = True
+
+
+class DeadlineExceeded(ModelError):
+    pass
+
+
+class InvalidRequestError(ModelError):
+    pass
+
+
+class AuthenticationError(ModelError):
+    pass
+
+
+class EmptyResponseError(ModelError):
+    """No text came back (e.g. the prompt or answer was blocked)."""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delay or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+def error_for_status(status, message, retry_after=None):
+    if status == 429:
+        return RateLimitError(message, retry_after)
+    if status in (408, 500, 502, 503, 504):
+        return TransientError(message)
+    if status in (401, 403):
+        return AuthenticationError(message)
+    if status in (400, 404, 413):
+        return InvalidRequestError(message)
+    return ModelError(message)
+
+
+@dataclass
+class Completion:
+    text: str
+    tokens_in: int = None
+    tokens_out: int = None
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """Token bucket refilled at ``rate`` per second; ``rate=None`` only honours pauses."""
+
+    def __init__(self, rate=None, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or (max(1.0, rate) if rate else 1.0)
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_time(self, cost, now):
+        if now < self.paused_until:
+            return self.paused_until - now
+        if not self.rate or self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def acquire(self, cost=1.0, deadline=None):
+        """Block until ``cost`` tokens are available; returns the time waited."""
+        cost = min(cost, self.capacity)
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self._wait_time(cost, now)
+                if delay <= 0:
+                    if self.rate:
+                        self.tokens -= cost
+                    return now - started
+            if deadline is not None and now + delay > deadline:
+                raise DeadlineExceeded("Deadline exceeded while waiting for the rate limit")
+            time.sleep(delay)
+
+    def try_acquire(self, cost=1.0):
+        cost = min(cost, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._wait_time(cost, now) > 0:
+                return False
+            if self.rate:
+                self.tokens -= cost
+            return True
+
+    def pause(self, seconds):
+        """Stop handing out tokens for ``seconds`` (used after a 429)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            if self.rate:
+                self.tokens = 0.0
+
+
+def backoff_delay(attempt, base=BASE_DELAY_S, cap=MAX_DELAY_S, rng=random):
+    """Full-jitter exponential backoff for retry number ``attempt`` (1-based)."""
+    return rng.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+# --- Transports ---
+def _parse_completion(data):
+    candidates = data.get("candidates") or []
+    usage = data.get("usageMetadata") or {}
+    parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+    return Completion("".join(part.get("text", "") for part in parts),
+                      usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
+
+
+def _blocked_reason(data):
+    feedback = data.get("promptFeedback") or {}
+    if feedback.get("blockReason"):
+        return f"Prompt blocked: {feedback['blockReason']}"
+    candidates = data.get("candidates") or []
+    if candidates and candidates[0].get("finishReason") not in (None, "STOP", "MAX_TOKENS"):
+        return f"Response stopped: {candidates[0]['finishReason']}"
+    return "No response generated."
+
+
+class RestTransport:
+    """Gemini REST API over one keep-alive HTTP connection per thread."""
+
+    def __init__(self, api_key, model_name, base_url=DEFAULT_BASE_URL, api_version=API_VERSION):
+        url = urllib.parse.urlsplit(base_url)
+        self.api_key = api_key
+        self.model_name = model_name
+        self._connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self._host = url.netloc
+        self._prefix = f"{url.path.rstrip('/')}/{api_version}/models/{model_name}"
+        self._local = threading.local()
+
+    def _connection(self, timeout):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connection_class(self._host, timeout=timeout)
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection
+
+    def _drop_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _post(self, method, prompt, timeout):
+        # Bytes, so http.client sends headers and body in one segment (no Nagle/delayed-ACK stall).
+        body = json.dumps({"contents": [{"role": "user", "parts": [{"text": prompt}]}]}).encode("utf-8")
+        headers = {"Content-Type": "application/json", "x-goog-api-key": self.api_key}
+        # A reused connection may have been closed by the server; retry once on a fresh one.
+        for fresh in (False, True):
+            connection = self._connection(timeout)
+            try:
+                connection.request("POST", f"{self._prefix}:{method}", body, headers)
+                response = connection.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self._drop_connection()
+                if fresh:
+                    raise TransientError(f"Connection lost: {e}") from e
+            except TimeoutError as e:
+                self._drop_connection()
+                raise TransientError("Request timed out") from e
+            except (OSError, http.client.HTTPException) as e:
+                self._drop_connection()
+                raise TransientError(f"Connection failed: {e}") from e
+        if response.status != 200:
+            payload = response.read()
+            try:
+                message = json.loads(payload)["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                message = payload.decode("utf-8", "replace").strip() or response.reason
+            raise error_for_status(response.status, f"{response.status}: {message}",
+                                   parse_retry_after(response.getheader("Retry-After")))
+        return response
+
+    def generate(self, prompt, timeout):
+        response = self._post("generateContent", prompt, timeout)
+        try:
+            data = json.loads(response.read())
+        except TimeoutError as e:
+            self._drop_connection()
+            raise TransientError("Response timed out") from e
+        completion = _parse_completion(data)
+        if not completion.text:
+            raise EmptyResponseError(_blocked_reason(data))
+        return completion
+
+    def stream(self, prompt, timeout):
+        response = self._post("streamGenerateContent?alt=sse", prompt, timeout)
+        try:
+            for line in response:
+                if line.startswith(b"data:"):
+                    yield _parse_completion(json.loads(line[5:]))
+        except TimeoutError as e:
+            self._drop_connection()
+            raise TransientError("Stream timed out") from e
+        except GeneratorExit:
+            # Abandoned mid-stream: the connection cannot be reused.
+            self._drop_connection()
+            raise
+
+
+_SDK_ERRORS = {
+    "ResourceExhausted": RateLimitError, "TooManyRequests": RateLimitError,
+    "ServiceUnavailable": TransientError, "InternalServerError": TransientError,
+    "DeadlineExceeded": TransientError, "GatewayTimeout": TransientError, "BadGateway": TransientError,
+    "InvalidArgument": InvalidRequestError, "BadRequest": InvalidRequestError, "NotFound": InvalidRequestError,
+    "PermissionDenied": AuthenticationError, "Unauthenticated": AuthenticationError,
+    "Forbidden": AuthenticationError, "Unauthorized": AuthenticationError,
+}
+
+
+def _sdk_error(e):
+    for cls in type(e).__mro__:
+        if cls.__name__ in _SDK_ERRORS:
+            return _SDK_ERRORS[cls.__name__](str(e))
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return TransientError(str(e))
+    return ModelError(str(e))
+
+
+def _sdk_completion(response):
+    usage = getattr(response, "usage_metadata", None)
+    try:
+        text = response.text
+    except ValueError as e:
+        # The SDK raises ValueError when the candidate was blocked.
+        raise EmptyResponseError(str(e)) from e
+    return Completion(text, getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None))
+
+
+class SdkTransport:
+    """Adapts a ``google.generativeai`` model (or a fake with ``generate_content``)."""
+
+    def __init__(self, model):
+        self.model = model
+        self.model_name = getattr(model, "model_name", None)
+        self._is_sdk = type(model).__module__.startswith("google.")
+
+    def _options(self, timeout):
+        return {"request_options": {"timeout": timeout}} if self._is_sdk else {}
+
+    def generate(self, prompt, timeout):
+        try:
+            response = self.model.generate_content(prompt, **self._options(timeout))
+        except ModelError:
+            raise
+        except Exception as e:
+            raise _sdk_error(e) from e
+        if not response:
+            raise EmptyResponseError("No response generated.")
+        completion = _sdk_completion(response)
+        if not completion.text:
+            raise EmptyResponseError("No response generated.")
+        return completion
+
+    def stream(self, prompt, timeout):
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True, **self._options(timeout)):
+                yield _sdk_completion(chunk)
+        except ModelError:
+            raise
+        except Exception as e:
+            raise _sdk_error(e) from e
+
+
+# --- Client ---
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(role="requests"):
+    # "requests" runs transport calls; "callers" runs blocking calls for the
+    # async API, kept separate so callers never wait on their own pool.
+    with _executor_lock:
+        if role not in _executors:
+            _executors[role] = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix=f"gemini-{role}")
+        return _executors[role]
+
+
+def _env_float(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+class GeminiClient:
+    def __init__(self, transport, rpm=None, tpm=None, timeout=TIMEOUT_S, max_attempts=MAX_ATTEMPTS,
+                 base_delay=BASE_DELAY_S, max_delay=MAX_DELAY_S, hedge_after=None, rng=None):
+        self.transport = transport
+        self.model_name = transport.model_name
+        # Bursts of up to ~6 s worth of quota; Gemini enforces per-minute limits.
+        self.requests = TokenBucket(rpm / 60 if rpm else None, max(1.0, rpm / 10) if rpm else None)
+        self.tokens = TokenBucket(tpm / 60, tpm / 10) if tpm else None
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+        self._rng = rng or random.Random()
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "rate_limited": 0, "hedged": 0, "hedge_wins": 0,
+                       "failures": 0, "rate_wait_s": 0.0}
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _acquire(self, prompt, deadline):
+        waited = self.requests.acquire(1, deadline)
+        if self.tokens is not None:
+            waited += self.tokens.acquire(estimate_tokens(prompt), deadline)
+        self._count(rate_wait_s=waited)
+        return waited
+
+    def _backoff(self, error, attempt, deadline):
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay, self._rng)
+        if isinstance(error, RateLimitError):
+            self._count(rate_limited=1)
+            if error.retry_after:
+                delay = max(delay, error.retry_after)
+                self.requests.pause(error.retry_after)
+        if time.monotonic() + delay >= deadline:
+            raise DeadlineExceeded(f"Deadline exceeded after {attempt} attempt(s): {error}") from error
+        self._count(retries=1)
+        time.sleep(delay)
+
+    def _attempt(self, prompt, deadline, active):
+        """One (possibly hedged) attempt; returns the first successful completion."""
+        executor = _get_executor()
+        remaining = deadline - time.monotonic()
+        futures = {executor.submit(self.transport.generate, prompt, remaining)}
+        hedge = None
+        if self.hedge_after is not None and self.hedge_after < remaining:
+            done, _ = wait(futures, timeout=self.hedge_after)
+            if not done and self.requests.try_acquire():
+                hedge = executor.submit(self.transport.generate, prompt, deadline - time.monotonic())
+                futures.add(hedge)
+                self._count(hedged=1)
+                active.set(hedged=True)
+        error = None
+        while futures:
+            done, futures = wait(futures, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("No response before the deadline")
+            for future in done:
+                try:
+                    completion = future.result()
+                except ModelError as e:
+                    error = error or e
+                    continue
+                if future is hedge:
+                    self._count(hedge_wins=1)
+                return completion
+        raise error
+
+    def generate(self, prompt, timeout=None):
+        """Return a ``Completion`` or raise ``ModelError``; ``timeout`` bounds the whole call."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        self._count(calls=1)
+        with span("gemini", bytes_in=len(prompt), model=self.model_name) as active:
+            try:
+                for attempt in range(1, self.max_attempts + 1):
+                    active.set(attempts=attempt)
+                    try:
+                        self._acquire(prompt, deadline)
+                        completion = self._attempt(prompt, deadline, active)
+                    except ModelError as e:
+                        if not e.retryable or attempt == self.max_attempts:
+                            raise
+                        self._backoff(e, attempt, deadline)
+                        continue
+                    active.set(tokens_in=completion.tokens_in, tokens_out=completion.tokens_out,
+                               bytes_out=len(completion.text))
+                    return completion
+            except ModelError:
+                self._count(failures=1)
+                raise
+
+    def stream(self, prompt, timeout=None):
+        """Yield text pieces; retried only until the first piece has been produced."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        self._count(calls=1)
+        with span("gemini_stream", bytes_in=len(prompt), model=self.model_name) as active:
+            try:
+                for attempt in range(1, self.max_attempts + 1):
+                    active.set(attempts=attempt)
+                    started = False
+                    try:
+                        self._acquire(prompt, deadline)
+                        last = None
+                        for piece in self.transport.stream(prompt, deadline - time.monotonic()):
+                            last = piece
+                            if piece.text:
+                                started = True
+                                yield piece.text
+                            if time.monotonic() > deadline:
+                                raise DeadlineExceeded("Deadline exceeded while streaming")
+                        if not started:
+                            raise EmptyResponseError("No response generated.")
+                    except ModelError as e:
+                        if started or not e.retryable or attempt == self.max_attempts:
+                            raise
+                        self._backoff(e, attempt, deadline)
+                        continue
+                    active.set(tokens_in=last.tokens_in, tokens_out=last.tokens_out)
+                    return
+            except ModelError:
+                self._count(failures=1)
+                raise
+
+    # --- Async API ---
+    async def agenerate(self, prompt, timeout=None):
+        # Runs the blocking call on a worker thread; limits and retries are shared.
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(_get_executor("callers"), context.run, self.generate, prompt, timeout)
+
+    async def agenerate_many(self, prompts, concurrency=4, timeout=None):
+        """Complete ``prompts`` concurrently (results keep input order)."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(prompt):
+            async with semaphore:
+                return await self.agenerate(prompt, timeout)
+
+        return await asyncio.gather(*(one(prompt) for prompt in prompts))
+
+
+def create_client(api_key, model_name, base_url=None, rpm=None, tpm=None, hedge_after=None, **options):
+    """REST client; limits default to ``NOTENINJA_GEMINI_RPM``/``_TPM``/``_HEDGE_S``."""
+    base_url = base_url or os.environ.get("NOTENINJA_GEMINI_URL") or DEFAULT_BASE_URL
+    return GeminiClient(
+        RestTransport(api_key, model_name, base_url),
+        rpm=rpm or _env_float("NOTENINJA_GEMINI_RPM"),
+        tpm=tpm or _env_float("NOTENINJA_GEMINI_TPM"),
+        hedge_after=hedge_after if hedge_after is not None else _env_float("NOTENINJA_GEMINI_HEDGE_S"),
+        **options,
+    )
+
+
+_wrapped = weakref.WeakKeyDictionary()
+_wrapped_lock = threading.Lock()
+
+
+def as_client(model):
+    """``model`` itself if it is a ``GeminiClient``, else a cached client around it."""
+    if isinstance(model, GeminiClient):
+        return model
+    with _wrapped_lock:
+        client = _wrapped.get(model)
+        if client is None:
+            client = _wrapped[model] = GeminiClient(SdkTransport(model))
+        return client
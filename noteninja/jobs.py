@@ -0,0 +1,146 @@
+"""Per-session workspaces and a background job pool shared by all sessions.
+
+Each Streamlit session gets its own ``Session`` (temp directory, recording
+state, submitted jobs) instead of module globals, and long-running work is
+submitted to one process-wide ``JobManager`` so the script thread only polls.
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from noteninja.streaming import StreamCollector, StreamMetrics
+from noteninja.tracing import span
+
+WORKERS = int(os.environ.get("NOTENINJA_WORKERS", "4"))
+JOBS_PER_SESSION = 20
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+# --- Workspace ---
+class SessionWorkspace:
+    """Private temp directory, removed when the session is garbage collected."""
+
+    def __init__(self, root=None):
+        self.directory = tempfile.mkdtemp(prefix="noteninja-", dir=root)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.directory, True)
+        self._names = itertools.count()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def unique_path(self, suffix):
+        return self.path(f"{next(self._names):04d}{suffix}")
+
+    def cleanup(self):
+        self._finalizer()
+
+
+class Session:
+    def __init__(self, root=None):
+        self.id = uuid.uuid4().hex
+        self.workspace = SessionWorkspace(root)
+        self.recorder = None
+        self.stop_event = threading.Event()
+        self.recording_thread = None
+        self.segment_jobs = []
+        self.live = None
+        self.recording_job = None
+        self.jobs_by_input = {}
+
+
+# --- Jobs ---
+class Job:
+    def __init__(self, kind, session_id):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.session_id = session_id
+        self.status = QUEUED
+        self.progress = "Queued"
+        self.stream = StreamCollector()
+        self.metrics = StreamMetrics()
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _run(self, fn, args):
+        self.status, self.progress = RUNNING, "Running"
+        self.started_at = time.time()
+        try:
+            with span(f"job.{self.kind}"):
+                self.result = fn(self, *args)
+            self.status, self.progress = DONE, "Done"
+        except Exception as e:
+            self.error = str(e)
+            self.status, self.progress = FAILED, "Failed"
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+        return self.result
+
+
+class JobManager:
+    """Runs ``fn(job, *args)`` on a bounded worker pool shared by all sessions."""
+
+    def __init__(self, max_workers=WORKERS, jobs_per_session=JOBS_PER_SESSION):
+        self.max_workers = max_workers
+        self.jobs_per_session = jobs_per_session
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="noteninja-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, kind, fn, *args):
+        job = Job(kind, session_id)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune(session_id)
+        self._pool.submit(job._run, fn, args)
+        return job
+
+    def _prune(self, session_id):
+        finished = [job for job in self._jobs.values() if job.session_id == session_id and job.finished]
+        excess = len(finished) - self.jobs_per_session
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(excess, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self, session_id=None):
+        with self._lock:
+            return [job for job in self._jobs.values() if session_id is None or job.session_id == session_id]
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,98 @@
+"""Rolling transcript and running minutes for an in-progress recording.
+
+Segment transcripts arrive out of order from background jobs; ``LiveMinutes``
+appends them to the transcript in segment order and, once enough new text has
+accumulated, folds it into the running notes on a single background worker
+(``summarize.update_summary``: previous notes + new text only). When the
+recording stops, ``final_text`` is the notes plus the not-yet-summarised
+tail, so the MOM request is small no matter how long the meeting was.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from noteninja.summarize import estimate_tokens, update_summary
+
+REFRESH_TOKENS = 1500   # about ten minutes of speech
+
+
+class LiveMinutes:
+    def __init__(self, client, refresh_tokens=REFRESH_TOKENS):
+        self.client = client
+        self.refresh_tokens = refresh_tokens
+        self.notes = ""
+        self.refreshes = 0
+        self.updated_at = None
+        self.error = None
+        self._parts = []            # transcript parts in segment order (None = nothing understood)
+        self._waiting = {}          # out-of-order segments
+        self._summarized = 0        # parts already folded into the notes
+        self._pending = None
+        self._finishing = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="noteninja-live")
+
+    # --- Transcript ---
+    def add(self, index, text):
+        """Record the transcript of segment ``index`` (None if nothing was understood)."""
+        with self._lock:
+            self._waiting[index] = text
+            while len(self._parts) in self._waiting:
+                self._parts.append(self._waiting.pop(len(self._parts)))
+            self._maybe_refresh()
+
+    @property
+    def segments(self):
+        with self._lock:
+            return len(self._parts)
+
+    @property
+    def transcript(self):
+        with self._lock:
+            return "\n".join(part for part in self._parts if part)
+
+    def _tail(self):
+        return "\n".join(part for part in self._parts[self._summarized:] if part)
+
+    # --- Running notes ---
+    def _maybe_refresh(self):
+        # Called with the lock held; one refresh at a time, later text waits for the next one.
+        if (self._pending is None and not self._finishing
+                and estimate_tokens(self._tail()) >= self.refresh_tokens):
+            self._pending = self._executor.submit(self._refresh, len(self._parts), self._tail(), self.notes)
+
+    def _refresh(self, upto, text, notes):
+        try:
+            notes = update_summary(notes, text, self.client)
+        except Exception as e:
+            # The text stays in the tail and is sent with the final request instead.
+            print(f"Live summary update failed: {e}")
+            with self._lock:
+                self.error = str(e)
+                self._pending = None
+            return
+        with self._lock:
+            self.notes, self._summarized = notes, upto
+            self.refreshes += 1
+            self.updated_at = time.time()
+            self.error = None
+            self._pending = None
+            self._maybe_refresh()
+
+    def final_text(self):
+        """Wait for a running refresh, then return the text the final MOM is built from."""
+        with self._lock:
+            self._finishing = True
+            pending = self._pending
+        if pending is not None:
+            pending.result()
+        with self._lock:
+            tail = self._tail()
+            if not self.notes:
+                return tail
+            if not tail:
+                return self.notes
+            return f"Notes so far:\n{self.notes}\n\nLatest part of the transcript:\n{tail}"
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,187 @@
+"""Streaming, page-parallel PDF text extraction.
+
+``iter_pages`` yields pages in order as they are extracted; documents with at
+least ``PARALLEL_PAGES`` pages are split into page ranges handled by one
+process pool shared by all documents (started with forkserver/spawn, never
+by forking the threaded app; each worker parses a PDF once). ``LineNormalizer`` applies
+``normalize_text`` incrementally, so the result of
+``extract_normalized_text`` is identical to
+``normalize_text(extract_text_from_pdf(...))`` without building the raw text.
+pypdf is imported on first use, so importing this module stays cheap.
+"""
+import io
+import multiprocessing
+import multiprocessing.util
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+
+PARALLEL_PAGES = 50
+PAGES_PER_TASK = 8
+POOL_WORKERS = int(os.environ.get("NOTENINJA_PDF_WORKERS", 0)) or os.cpu_count() or 1
+
+
+@dataclass
+class PageText:
+    index: int
+    text: str
+    seconds: float
+
+
+def _read_bytes(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    return source.read()
+
+
+def _extract(page):
+    started = time.perf_counter()
+    text = page.extract_text()
+    return text, time.perf_counter() - started
+
+
+# --- Worker process ---
+@lru_cache(maxsize=2)
+def _worker_reader(path):
+    # Each document is copied to a uniquely named temp file, so the path is its identity.
+    from pypdf import PdfReader
+    with open(path, "rb") as f:
+        return PdfReader(io.BytesIO(f.read()))
+
+
+def _extract_range(path, start, end):
+    reader = _worker_reader(path)
+    return [(index, *_extract(reader.pages[index])) for index in range(start, end)]
+
+
+# --- Shared pool ---
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _start_method():
+    # Forking a process with live threads (Streamlit, job pools) can leave
+    # children deadlocked on locks that were held at fork time.
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def get_pool():
+    """Process pool shared by every PDF extraction in the process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS,
+                                        mp_context=multiprocessing.get_context(_start_method()))
+            # Inside a multiprocessing child the exit handler joins all child
+            # processes before the executor's own shutdown runs; stop the idle
+            # workers first (ahead of the finalizers that close its queues).
+            multiprocessing.util.Finalize(None, _shutdown_pool, exitpriority=100)
+        return _pool
+
+
+def _shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# --- Extraction ---
+def iter_pages(source, workers=None, parallel_pages=PARALLEL_PAGES, pages_per_task=PAGES_PER_TASK):
+    """Yield ``PageText`` for every page of ``source`` in page order."""
+    from pypdf import PdfReader
+    data = _read_bytes(source)
+    reader = PdfReader(io.BytesIO(data))
+    n_pages = len(reader.pages)
+    workers = min(workers or POOL_WORKERS, POOL_WORKERS)
+    if n_pages < parallel_pages or workers < 2:
+        for index, page in enumerate(reader.pages):
+            yield PageText(index, *_extract(page))
+        return
+    del reader
+
+    ranges = [(start, min(start + pages_per_task, n_pages)) for start in range(0, n_pages, pages_per_task)]
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(data)
+    pool, pending = get_pool(), []
+    try:
+        # Keep a bounded window of ranges in flight and yield strictly in order;
+        # documents extracted at the same time share the pool's workers.
+        window = 2 * workers
+        pending = [pool.submit(_extract_range, f.name, *r) for r in ranges[:window]]
+        next_range = len(pending)
+        while pending:
+            for index, text, seconds in pending.pop(0).result():
+                yield PageText(index, text, seconds)
+            if next_range < len(ranges):
+                pending.append(pool.submit(_extract_range, f.name, *ranges[next_range]))
+                next_range += 1
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        try:
+            os.remove(f.name)
+        except OSError:
+            pass
+
+
+# --- Incremental normalisation ---
+class LineNormalizer:
+    """Equivalent of ``" ".join(l.strip() for l in text.splitlines())`` fed in pieces."""
+
+    def __init__(self):
+        self.parts = []
+        self._carry = ""
+
+    def feed(self, text):
+        lines = (self._carry + text).splitlines(keepends=True)
+        # The last line may continue in the next piece (including a lone "\r"
+        # that could be the first half of "\r\n").
+        if lines and (lines[-1].endswith("\r") or lines[-1].splitlines()[0] == lines[-1]):
+            self._carry = lines.pop()
+        else:
+            self._carry = ""
+        self.parts.extend(line.strip() for line in lines)
+
+    def finish(self):
+        if self._carry:
+            self.parts.append(self._carry.strip())
+            self._carry = ""
+        return " ".join(self.parts)
+
+
+def extract_normalized_text(source, on_page=None, **options):
+    """Extract and normalise in one pass; ``on_page(page, n_done)`` reports progress."""
+    normalizer = LineNormalizer()
+    for done, page in enumerate(iter_pages(source, **options), 1):
+        normalizer.feed(page.text)
+        if on_page:
+            on_page(page, done)
+    return normalizer.finish()
+
+
+def extract_text(source, **options):
+    return "".join(page.text for page in iter_pages(source, **options))
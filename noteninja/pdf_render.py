@@ -0,0 +1,385 @@
+"""Shared MOM PDF renderer.
+
+The bundled TrueType fonts are parsed once per process, and the embedded font
+program (subset, glyph map and widths) is built once per character set and
+reused by every document, so rendering a MOM costs layout plus a few writes.
+``parse_mom`` turns the model output into headings, paragraphs, bullet lists
+and tables (markdown tables and "task - owner - due" action items), which
+``render_mom_pdf`` lays out. Lines that Arial cannot draw fall back to DejaVu
+Sans; characters neither font has are replaced with "?".
+"""
+import os
+import re
+import zlib
+from collections import namedtuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from fpdf import FPDF
+from fpdf.ttfonts import TTFontFile
+
+FONT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Keys are FPDF font families; "arial" itself is reserved for the core font.
+FONTS = {"arialuni": "Arial.ttf", "dejavusans": "DejaVuSans.ttf"}
+# Always embedded so that typical documents share one cached subset.
+BASE_CHARSET = frozenset(range(32, 127)) | frozenset(map(ord, "•–—‘’“”…"))
+MAX_SUBSETS = 32
+
+BODY_SIZE = 11
+HEADING_SIZE = 13
+LINE_HEIGHT = 6
+BULLET_INDENT = 6
+TABLE_MAX_COLUMNS = 6
+
+
+# --- Fonts ---
+FontMetrics = namedtuple("FontMetrics", "name desc up ut cw path")
+EmbeddedFont = namedtuple("EmbeddedFont", "widths cid_to_gid font_stream font_length")
+
+
+@lru_cache(maxsize=None)
+def font_metrics(key):
+    """Parse a bundled TTF once per process (FPDF would on every document)."""
+    path = os.path.join(FONT_DIR, FONTS[key])
+    ttf = TTFontFile()
+    ttf.getMetrics(path)
+    desc = {
+        "Ascent": int(round(ttf.ascent)),
+        "Descent": int(round(ttf.descent)),
+        "CapHeight": int(round(ttf.capHeight)),
+        "Flags": ttf.flags,
+        "FontBBox": "[%s %s %s %s]" % tuple(int(round(v)) for v in ttf.bbox),
+        "ItalicAngle": int(ttf.italicAngle),
+        "StemV": int(round(ttf.stemV)),
+        "MissingWidth": int(round(ttf.defaultWidth)),
+    }
+    return FontMetrics(re.sub("[ ()]", "", ttf.fullName), desc, round(ttf.underlinePosition),
+                       round(ttf.underlineThickness), ttf.charWidths, path)
+
+
+def _widths_array(cw, codepoints):
+    # /W entries for consecutive runs: "first [w1 w2 ...]".
+    runs, start, widths, previous = [], None, [], None
+    for cp in codepoints:
+        width = cw[cp]
+        if not width:
+            continue
+        if width == 65535:
+            width = 0
+        if previous is not None and cp == previous + 1:
+            widths.append(width)
+        else:
+            if widths:
+                runs.append("%d [%s]" % (start, " ".join(str(w) for w in widths)))
+            start, widths = cp, [width]
+        previous = cp
+    if widths:
+        runs.append("%d [%s]" % (start, " ".join(str(w) for w in widths)))
+    return "/W [%s]" % " ".join(runs)
+
+
+@lru_cache(maxsize=MAX_SUBSETS)
+def embedded_font(key, codepoints):
+    """Subset, compress and describe ``codepoints`` of a font (cached per character set)."""
+    metrics = font_metrics(key)
+    ttf = TTFontFile()
+    subset = ttf.makeSubset(metrics.path, list(codepoints))
+    cid_to_gid = bytearray(256 * 256 * 2)
+    for code, glyph in ttf.codeToGlyph.items():
+        cid_to_gid[code * 2] = glyph >> 8
+        cid_to_gid[code * 2 + 1] = glyph & 0xFF
+    return EmbeddedFont(_widths_array(metrics.cw, codepoints), zlib.compress(bytes(cid_to_gid)),
+                        zlib.compress(subset), len(subset))
+
+
+class MomPDF(FPDF):
+    """FPDF with the bundled fonts preloaded from the process-wide cache."""
+
+    def __init__(self):
+        super().__init__()
+        self.set_auto_page_break(auto=True, margin=15)
+
+    def set_font(self, family, style="", size=0):
+        # Registered on first use, so DejaVu is only parsed if a document needs it.
+        if family in FONTS and family not in self.fonts:
+            metrics = font_metrics(family)
+            self.fonts[family] = {
+                "i": len(self.fonts) + 1, "type": "TTF", "name": metrics.name, "desc": metrics.desc,
+                "up": metrics.up, "ut": metrics.ut, "cw": metrics.cw, "ttffile": metrics.path,
+                "fontkey": family, "subset": [], "unifilename": None,
+            }
+        super().set_font(family, style, size)
+
+    def get_string_width(self, s):
+        # multi_cell calls this once per character; text passed through
+        # ``drawable`` only has characters inside the width table.
+        if self.unifontsubset:
+            cw = self.current_font["cw"]
+            return sum(map(cw.__getitem__, map(ord, s))) * self.font_size / 1000.0
+        return super().get_string_width(s)
+
+    def _putfonts(self):
+        own = {key: self.fonts.pop(key) for key in FONTS if key in self.fonts}
+        super()._putfonts()
+        for key, font in own.items():
+            # Fonts no page used are left out of the document entirely.
+            if font["subset"]:
+                codepoints = tuple(sorted(BASE_CHARSET.union(font["subset"])))
+                self._put_embedded_font(font, embedded_font(key, codepoints))
+                self.fonts[key] = font
+
+    def _put_embedded_font(self, font, embedded):
+        # Same object layout FPDF writes for a subset TrueType font.
+        font["n"] = self.n + 1
+        font_name = "MPDFAA+" + font["name"]
+        self._newobj()
+        self._out("<</Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H" % font_name)
+        self._out("/DescendantFonts [%d 0 R] /ToUnicode %d 0 R>>" % (self.n + 1, self.n + 2))
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Type /Font /Subtype /CIDFontType2 /BaseFont /%s" % font_name)
+        self._out("/CIDSystemInfo %d 0 R /FontDescriptor %d 0 R" % (self.n + 2, self.n + 3))
+        self._out("/DW %d" % font["desc"]["MissingWidth"])
+        self._out(embedded.widths)
+        self._out("/CIDToGIDMap %d 0 R>>" % (self.n + 4))
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Length %d>>" % len(_TO_UNICODE))
+        self._putstream(_TO_UNICODE)
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Registry (Adobe) /Ordering (UCS) /Supplement 0>>")
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Type /FontDescriptor /FontName /%s" % font_name)
+        for name in ("Ascent", "Descent", "CapHeight", "Flags", "FontBBox", "ItalicAngle", "StemV", "MissingWidth"):
+            value = font["desc"][name]
+            if name == "Flags":
+                value = (value | 4) & ~32
+            self._out(" /%s %s" % (name, value))
+        self._out("/FontFile2 %d 0 R>>" % (self.n + 2))
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Length %d /Filter /FlateDecode>>" % len(embedded.cid_to_gid))
+        self._putstream(embedded.cid_to_gid)
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<</Length %d /Filter /FlateDecode /Length1 %d>>"
+                  % (len(embedded.font_stream), embedded.font_length))
+        self._putstream(embedded.font_stream)
+        self._out("endobj")
+
+
+_TO_UNICODE = (
+    "/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+    "/CIDSystemInfo\n<</Registry (Adobe)\n/Ordering (UCS)\n/Supplement 0\n>> def\n"
+    "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+    "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+    "1 beginbfrange\n<0000> <FFFF> <0000>\nendbfrange\n"
+    "endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+)
+
+
+def font_for(text):
+    """Arial when it has every glyph of ``text``, else DejaVu Sans."""
+    arial = font_metrics("arialuni").cw
+    if all(ord(c) < 0x10000 and arial[ord(c)] for c in text if c > "~"):
+        return "arialuni"
+    return "dejavusans"
+
+
+def drawable(text, key):
+    cw = font_metrics(key).cw
+    return "".join(c if c <= "~" or (ord(c) < 0x10000 and cw[ord(c)]) else "?"
+                   for c in text.replace("\t", "    "))
+
+
+# --- MOM structure ---
+@dataclass
+class Block:
+    kind: str                   # "heading", "paragraph", "bullet" or "table"
+    text: str = ""
+    level: int = 0              # bullet nesting
+    marker: str = "•"
+    rows: list = field(default_factory=list)
+    header: bool = False        # first table row is a header
+
+
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*$")
+_BOLD_LINE_RE = re.compile(r"^(\*\*|__)(.+?)\1:?$")
+_BULLET_RE = re.compile(r"^(\s*)([-*+•●▪–]|\d{1,3}[.)]|[a-z][.)])\s+(.+)$")
+_TABLE_SEPARATOR_RE = re.compile(r"^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$")
+_ACTION_HEADING_RE = re.compile(r"\b(action items?|actions|next steps|tasks|follow[- ]ups?)\b", re.IGNORECASE)
+_ACTION_SPLIT_RE = re.compile(r"\s+[-–—|]\s+")
+_INLINE_RE = re.compile(r"(\*\*|__|`)")
+
+
+def _clean(text):
+    return _INLINE_RE.sub("", text).strip()
+
+
+def _is_label_heading(line):
+    # "Attendees:" / "Key Decisions:" on their own line.
+    return line.endswith(":") and len(line) <= 60 and not re.search(r"[.;!?]", line[:-1])
+
+
+def parse_mom(text):
+    """Split MOM text (a string or list of lines) into layout blocks."""
+    lines = text.splitlines() if isinstance(text, str) else [l for piece in text for l in piece.splitlines()]
+    blocks = []
+    table = None
+    for raw in lines:
+        line = raw.strip()
+        if table is not None and not line.startswith("|"):
+            blocks.append(table)
+            table = None
+        if not line:
+            continue
+        if line.startswith("|"):
+            if _TABLE_SEPARATOR_RE.match(line):
+                if table is not None and len(table.rows) == 1:
+                    table.header = True
+                continue
+            cells = [_clean(cell) for cell in line.strip("|").split("|")]
+            if table is None:
+                table = Block("table")
+            table.rows.append(cells)
+            continue
+
+        heading = _HEADING_RE.match(line) or _BOLD_LINE_RE.match(line)
+        if heading or (_is_label_heading(line) and not _BULLET_RE.match(raw)):
+            title = _clean(heading.group(heading.lastindex) if heading else line).rstrip(":")
+            blocks.append(Block("heading", title))
+            continue
+
+        bullet = _BULLET_RE.match(raw)
+        if bullet:
+            indent, marker, item = bullet.groups()
+            marker = marker if marker[0].isalnum() else "•"
+            blocks.append(Block("bullet", _clean(item), level=min(len(indent.expandtabs(4)) // 2, 2), marker=marker))
+        else:
+            blocks.append(Block("paragraph", _clean(line)))
+    if table is not None:
+        blocks.append(table)
+    return _action_tables(blocks)
+
+
+def _action_tables(blocks):
+    """Turn bullet runs under an action-items heading into tables when every item
+    splits into the same number of "task - owner - due" columns."""
+    result, i = [], 0
+    in_actions = False
+    while i < len(blocks):
+        block = blocks[i]
+        if block.kind == "heading":
+            in_actions = bool(_ACTION_HEADING_RE.search(block.text))
+        if not (in_actions and block.kind == "bullet"):
+            result.append(block)
+            i += 1
+            continue
+        run = []
+        while i < len(blocks) and blocks[i].kind == "bullet":
+            run.append(blocks[i])
+            i += 1
+        rows = [_ACTION_SPLIT_RE.split(b.text) for b in run]
+        widths = {len(row) for row in rows}
+        if len(widths) == 1 and 2 <= widths.pop() <= TABLE_MAX_COLUMNS:
+            result.append(Block("table", rows=rows))
+        else:
+            result.extend(run)
+    return result
+
+
+# --- Layout ---
+def _write(pdf, height, text, size, indent=0, width=0):
+    key = font_for(text)
+    pdf.set_font(key, size=size)
+    pdf.set_x(pdf.l_margin + indent)
+    pdf.multi_cell(width, height, drawable(text, key))
+
+
+def _column_widths(pdf, rows, total):
+    columns = max(len(row) for row in rows)
+    natural = [0.0] * columns
+    for row in rows:
+        for c, cell in enumerate(row):
+            natural[c] = max(natural[c], pdf.get_string_width(drawable(cell, "arialuni")) + 4)
+    floor = total / (columns * 3)
+    natural = [max(w, floor) for w in natural]
+    scale = min(1.0, total / sum(natural))
+    widths = [w * scale for w in natural]
+    # Give left-over space to the widest (usually the task) column.
+    widths[widths.index(max(widths))] += total - sum(widths)
+    return widths
+
+
+def _table(pdf, block):
+    pdf.set_font("arialuni", size=BODY_SIZE - 1)
+    total = pdf.w - pdf.l_margin - pdf.r_margin
+    widths = _column_widths(pdf, block.rows, total)
+    for r, row in enumerate(block.rows):
+        row = row + [""] * (len(widths) - len(row))
+        texts = []
+        for cell in row:
+            key = font_for(cell)
+            texts.append((key, drawable(cell, key)))
+        line_counts = []
+        for (key, text), width in zip(texts, widths):
+            pdf.set_font(key, size=BODY_SIZE - 1)
+            line_counts.append(len(pdf.multi_cell(width, LINE_HEIGHT, text, split_only=True)) or 1)
+        height = max(line_counts) * LINE_HEIGHT
+        if pdf.get_y() + height > pdf.page_break_trigger:
+            pdf.add_page()
+        x, y = pdf.l_margin, pdf.get_y()
+        shaded = block.header and r == 0
+        for (key, text), width in zip(texts, widths):
+            if shaded:
+                pdf.set_fill_color(230, 230, 230)
+            pdf.rect(x, y, width, height, "DF" if shaded else "D")
+            pdf.set_font(key, size=BODY_SIZE - 1)
+            pdf.set_xy(x, y)
+            pdf.multi_cell(width, LINE_HEIGHT, text)
+            x += width
+        pdf.set_xy(pdf.l_margin, y + height)
+    pdf.ln(2)
+
+
+def render_mom_pdf(text):
+    """Render MOM text (a string or the list of streamed lines) to PDF bytes."""
+    pdf = MomPDF()
+    pdf.add_page()
+    blocks = parse_mom(text)
+    if not blocks:
+        blocks = [Block("paragraph", "Error: No valid content to display.")]
+    for i, block in enumerate(blocks):
+        if block.kind == "heading":
+            if i:
+                pdf.ln(3)
+            _write(pdf, LINE_HEIGHT + 2, block.text, HEADING_SIZE)
+            y = pdf.get_y()
+            pdf.line(pdf.l_margin, y, pdf.w - pdf.r_margin, y)
+            pdf.ln(2)
+        elif block.kind == "bullet":
+            indent = BULLET_INDENT * (block.level + 1)
+            pdf.set_font("arialuni", size=BODY_SIZE)
+            marker_width = pdf.get_string_width(block.marker) + 2
+            y = pdf.get_y()
+            if y + LINE_HEIGHT > pdf.page_break_trigger:
+                pdf.add_page()
+                y = pdf.get_y()
+            pdf.set_xy(pdf.l_margin + indent - marker_width, y)
+            pdf.cell(marker_width, LINE_HEIGHT, block.marker)
+            pdf.set_xy(pdf.l_margin + indent, y)
+            _write(pdf, LINE_HEIGHT, block.text, BODY_SIZE, indent)
+        elif block.kind == "table":
+            _table(pdf, block)
+        else:
+            _write(pdf, LINE_HEIGHT, block.text, BODY_SIZE)
+            pdf.ln(1)
+    return pdf.output(dest="S").encode("latin-1")
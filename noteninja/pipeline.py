@@ -0,0 +1,309 @@
+"""MOM pipeline shared by the Streamlit page and the batch CLI.
+
+convert_mp3_to_wav -> transcribe_audio -> prepare_mom_prompt_* -> generate_mom
+-> generate_pdf_from_string_*. Functions that talk to Gemini take the model
+explicitly (a ``GeminiClient`` or a raw model object) and raise
+``noteninja.gemini.ModelError`` on failure; anything cacheable takes an
+optional ``cache`` (a ``ResultCache`` or None to bypass it).
+
+python-docx, SpeechRecognition and fpdf are imported by the functions that
+use them, so importing the pipeline (every Streamlit rerun, every batch
+worker) does not pay for them up front.
+"""
+import os
+import re
+import threading
+from datetime import date
+from pathlib import Path
+
+from noteninja.audio_io import ArraySource, decode_audio
+from noteninja.cache import make_key
+from noteninja.diarize import Diarizer
+from noteninja.gemini import as_client, create_client
+from noteninja.streaming import timed_stream
+from noteninja.summarize import summarize
+from noteninja.tracing import current_span, span
+from noteninja.transcription import GoogleRecognizerBackend, speech_regions, transcribe_file, transcribe_source
+
+MODEL_NAME = "gemini-2.0-flash-exp"
+
+TRANSCRIPTION_ERRORS = (
+    "Speech Recognition could not understand the audio.",
+    "Could not request results from Google Speech Recognition.",
+)
+
+
+# --- Result Cache ---
+def cached(cache, key, compute, should_store=None):
+    if cache is None:
+        return compute()
+    value = cache.get(key)
+    active = current_span()
+    if active is not None:
+        active.set(cache_hit=value is not None)
+    if value is not None:
+        return value
+    value = compute()
+    if value is not None and (should_store is None or should_store(value)):
+        cache.set(key, value)
+    return value
+
+
+# --- Gemini AI Functions ---
+def configure_model(api_key, model_name=MODEL_NAME, **options):
+    # Rate limits, deadlines, retries and hedging live in the client (see noteninja.gemini).
+    return create_client(api_key, model_name, **options)
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_model(api_key, model_name=MODEL_NAME):
+    """Process-wide client per key and model, so its rate limiter and
+    connections survive Streamlit reruns and are shared by all sessions."""
+    with _models_lock:
+        client = _models.get((api_key, model_name))
+        if client is None:
+            client = _models[api_key, model_name] = configure_model(api_key, model_name)
+        return client
+
+
+def generate_text(prompt, model):
+    return as_client(model).generate(prompt).text
+
+
+def generate_text_stream(prompt, model):
+    return as_client(model).stream(prompt)
+
+
+# --- Audio Conversion function ---
+def convert_mp3_to_wav(audio_file, output_file):
+    try:
+        from pydub import AudioSegment
+        sound = AudioSegment.from_mp3(audio_file)
+        sound.export(output_file, format="wav")
+    except Exception as e:
+        print(f"Error processing audio {e}")
+
+
+# --- Speech Recognition (Transcription) ---
+def transcribe_audio(audio_file, cache=None, backend=None, diarize=False):
+    """``diarize``: False, True (label speakers) or a shared ``Diarizer`` that
+    keeps speaker numbers consistent across segments of one recording."""
+    size = os.path.getsize(audio_file) if isinstance(audio_file, str) else None
+    diarizer, cache, kind = _diarizer(diarize, cache)
+    # make_key hashes a str as text; a Path makes it hash the file's bytes, so
+    # new audio written to the same path is not served an old transcript.
+    content = Path(audio_file) if isinstance(audio_file, str) else audio_file
+    with span("transcribe", bytes_in=size):
+        return cached(
+            cache,
+            make_key(kind, "google-web-speech", content),
+            lambda: _run_transcription(
+                lambda backend: transcribe_file(audio_file, backend, vad=True, diarizer=diarizer), backend),
+            should_store=lambda text: text not in TRANSCRIPTION_ERRORS,
+        )
+
+
+def transcribe_audio_bytes(data, file_name="", cache=None, backend=None, diarize=False):
+    """Transcribe uploaded/recorded bytes without writing a temp WAV."""
+    diarizer, cache, kind = _diarizer(diarize, cache)
+
+    def run(backend):
+        with span("decode", bytes_in=len(data)) as active:
+            samples, sample_rate = decode_audio(data, file_name)
+            active.set(bytes_out=samples.nbytes)
+        source = ArraySource(samples, sample_rate)
+        with span("vad", bytes_in=samples.nbytes):
+            regions = speech_regions(source)
+        return transcribe_source(source, backend, regions=regions, diarizer=diarizer)
+
+    with span("transcribe", bytes_in=len(data)):
+        return cached(
+            cache,
+            make_key(kind, "google-web-speech", data),
+            lambda: _run_transcription(run, backend),
+            should_store=lambda text: text not in TRANSCRIPTION_ERRORS,
+        )
+
+
+def _diarizer(diarize, cache):
+    # A shared Diarizer numbers speakers relative to earlier segments, so its
+    # output depends on more than this audio and is not cached.
+    if isinstance(diarize, Diarizer):
+        return diarize, None, "transcript-speakers"
+    if diarize:
+        return Diarizer(), cache, "transcript-speakers"
+    return None, cache, "transcript"
+
+
+_default_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_default_backend():
+    """Google Web Speech backend shared by every transcription in the process."""
+    global _default_backend
+    with _backend_lock:
+        if _default_backend is None:
+            _default_backend = GoogleRecognizerBackend()
+        return _default_backend
+
+
+def _run_transcription(run, backend=None):
+    # ``backend`` defaults to Google; benchmarks and tests pass an offline stub.
+    import speech_recognition as sr
+    try:
+        print("Transcribing audio...")
+        text = run(backend or get_default_backend())
+    except sr.RequestError:
+        print("Could not request results from Google Speech Recognition.")
+        return "Could not request results from Google Speech Recognition."
+    except Exception as e:
+        print(f"Transcription error {e}")
+        return None
+    if not text:
+        print("Speech Recognition could not understand the audio.")
+        return "Speech Recognition could not understand the audio."
+    print("Transcription Completed.")
+    print("\nTranscribed Text:\n", text)
+    return text
+
+
+# --- Meeting Date Extraction ---
+def extract_meeting_date(transcript):
+    today = date.today().strftime("%Y-%m-%d")
+    date_pattern = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')  # check for YYYY-MM-DD
+    match = date_pattern.search(transcript)
+    if match:
+        date_found = match.group(1)
+    else:
+        date_found = today
+    return date_found
+
+
+# --- Prompt Engineering for Audio ---
+SPEAKER_LABEL_RE = re.compile(r"^Speaker \d+:", re.MULTILINE)
+
+
+def prepare_mom_prompt_audio(transcript, date_found=None):
+    if date_found is None:
+        date_found = extract_meeting_date(transcript)
+
+    speakers = ""
+    if SPEAKER_LABEL_RE.search(transcript):
+        speakers = ("The transcript is labelled by speaker (Speaker 1, Speaker 2, ...); "
+                    "attribute decisions and action items to the speaker who made or took them. ")
+
+    prompt = (
+        f"Prepare a MOM (Minutes of Meeting) for the following transcript in a suitable format. "
+        f"Date: {date_found}. "
+        f"{speakers}"
+        f"Do not produce any pre- or post-texts. Generate insights based on the content logically. Keep it as concise as possible. "
+        f"Remove all unnecessary symbols or formatting: {transcript}"
+    )
+    return prompt
+
+
+# --- Prompt Engineering for Files ---
+def prepare_mom_prompt_files(transcript, date_found=None):
+    if date_found is None:
+        date_found = extract_meeting_date(transcript)
+
+    prompt = (
+        f"Provide a summary of the meeting in a suitable format. "
+        f"Date: {date_found}. "
+        f"Do not produce any pre- or post-texts. Summarize key insights logically. "
+        f"Remove all unnecessary symbols or formatting: {transcript}"
+    )
+    return prompt
+
+
+# --- Map-Reduce MOM Generation ---
+def _mom_key(text, prepare_prompt, model):
+    return make_key("mom", getattr(model, "model_name", MODEL_NAME), prepare_prompt.__name__, text)
+
+
+def generate_mom(text, prepare_prompt, model, cache=None):
+    # Long transcripts/documents are summarised in chunks first; the date is
+    # taken from the full text since the partial notes may not repeat it.
+    date_found = extract_meeting_date(text)
+
+    def compute():
+        return summarize(text, lambda prompt: generate_text(prompt, model),
+                         lambda notes: prepare_prompt(notes, date_found))
+
+    with span("mom", bytes_in=len(text)) as active:
+        result = cached(cache, _mom_key(text, prepare_prompt, model), compute)
+        active.set(bytes_out=len(result))
+        return result
+
+
+# --- Streaming MOM Generation ---
+def generate_mom_stream(text, prepare_prompt, model, metrics, cache=None, date_found=None):
+    with span("mom", bytes_in=len(text)) as active:
+        key = _mom_key(text, prepare_prompt, model)
+        hit = cache.get(key) if cache is not None else None
+        if cache is not None:
+            active.set(cache_hit=hit is not None)
+        if hit is not None:
+            active.set(bytes_out=len(hit))
+            yield from timed_stream([hit], metrics)
+            return
+        date_found = date_found or extract_meeting_date(text)
+        # Only the final MOM request is streamed; map/reduce steps stay blocking.
+        # A ModelError propagates to the caller and nothing is cached.
+        pieces = summarize(text, lambda prompt: generate_text(prompt, model),
+                           lambda notes: prepare_prompt(notes, date_found),
+                           final_client=lambda prompt: generate_text_stream(prompt, model))
+        collected = []
+        for piece in timed_stream(pieces, metrics):
+            collected.append(piece)
+            yield piece
+        active.set(bytes_out=sum(len(piece) for piece in collected),
+                   time_to_first_token_s=metrics.first_token_s)
+        if cache is not None and collected:
+            cache.set(key, "".join(collected))
+
+
+# --- PDF Generation Function for Audio ---
+def generate_pdf_from_string_audio(input_string, filename="output.pdf"):
+    from noteninja.pdf_render import render_mom_pdf
+    with span("pdf_render") as active:
+        pdf_bytes = render_mom_pdf(input_string)
+        active.set(bytes_out=len(pdf_bytes))
+        return pdf_bytes
+
+
+# --- PDF Generation Function for Files ---
+def generate_pdf_from_string_files(input_string, filename="output.pdf"):
+    # Both MOM flavours share one renderer (fonts cached per process, parsed layout).
+    from noteninja.pdf_render import render_mom_pdf
+    with span("pdf_render") as active:
+        pdf_bytes = render_mom_pdf(input_string)
+        active.set(bytes_out=len(pdf_bytes))
+        return pdf_bytes
+
+
+# --- Extract text from PDF file ---
+def extract_text_from_pdf(uploaded_file, **options):
+    # Pages are extracted lazily (in parallel for large documents) and joined once.
+    from noteninja.pdf_extract import extract_text
+    return extract_text(uploaded_file, **options)
+
+
+# --- Extract text from DOC file ---
+def extract_text_from_doc(uploaded_file):
+    import docx
+    doc = docx.Document(uploaded_file)
+    fullText = []
+    for para in doc.paragraphs:
+        fullText.append(para.text)
+    return '\n'.join(fullText)
+
+
+# --- Normalize the extracted text by merging all the lines ---
+def normalize_text(text):
+    lines = text.splitlines()
+    return " ".join(line.strip() for line in lines)
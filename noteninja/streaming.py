@@ -0,0 +1,74 @@
+"""Helpers for consuming streamed model output.
+
+``timed_stream`` wraps any iterator of text pieces and records time to first
+token and total latency; ``StreamCollector`` keeps the pieces and the completed
+lines as they arrive so the PDF builder can consume lines directly once the
+stream ends instead of re-splitting one large string.
+"""
+import time
+
+
+class StreamMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_s = None
+        self.total_s = None
+        self.chunks = 0
+        self.chars = 0
+
+    def record(self, piece):
+        if self.first_token_s is None:
+            self.first_token_s = time.perf_counter() - self.started
+        self.chunks += 1
+        self.chars += len(piece)
+
+    def finish(self):
+        self.total_s = time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            "time_to_first_token_s": self.first_token_s,
+            "total_s": self.total_s,
+            "chunks": self.chunks,
+            "chars": self.chars,
+        }
+
+
+def timed_stream(pieces, metrics):
+    """Yield non-empty pieces from ``pieces`` while updating ``metrics``."""
+    try:
+        for piece in pieces:
+            if piece:
+                metrics.record(piece)
+                yield piece
+    finally:
+        metrics.finish()
+
+
+class StreamCollector:
+    def __init__(self):
+        self.pieces = []
+        self.lines = []
+        self._partial = []
+
+    def add(self, piece):
+        self.pieces.append(piece)
+        if "\n" not in piece:
+            self._partial.append(piece)
+            return
+        first, *rest = piece.split("\n")
+        self._partial.append(first)
+        self.lines.append("".join(self._partial))
+        self.lines.extend(rest[:-1])
+        self._partial = [rest[-1]]
+
+    def finish(self):
+        tail = "".join(self._partial)
+        if tail:
+            self.lines.append(tail)
+        self._partial = []
+        return self.lines
+
+    @property
+    def text(self):
+        return "".join(self.pieces)
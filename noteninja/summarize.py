@@ -0,0 +1,132 @@
+"""Hierarchical (map-reduce) summarisation for long transcripts and documents.
+
+Text that fits in one request is sent as-is. Longer text is split into
+token-budgeted chunks on paragraph/sentence boundaries, each chunk is
+summarised concurrently, and the partial summaries are reduced (recursively if
+needed) before the final MOM prompt is built from them. ``update_summary``
+folds new text into existing notes for summaries that grow while recording.
+
+``client`` is any callable ``client(prompt) -> str``; tests can pass a
+deterministic fake instead of the Gemini model.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Defaults ---
+CHARS_PER_TOKEN = 4
+SINGLE_PASS_TOKENS = 30_000   # send directly when the whole text fits
+CHUNK_TOKENS = 8_000          # budget for one map request
+MAX_CONCURRENCY = 4
+
+MAP_PROMPT = (
+    "The following is part {part} of {total} of a longer meeting record. "
+    "Summarise it as concise notes. Keep every decision, action item, owner, "
+    "deadline and date that is mentioned. Do not produce any pre- or post-texts: {text}"
+)
+REDUCE_PROMPT = (
+    "Merge the following partial meeting notes into one set of concise notes. "
+    "Remove repetition but keep every decision, action item, owner, deadline "
+    "and date. Do not produce any pre- or post-texts: {text}"
+)
+ROLLING_PROMPT = (
+    "Below are the running notes of a meeting that is still in progress, followed "
+    "by the next part of its transcript. Return the updated notes with the new part "
+    "folded in. Keep every decision, action item, owner, deadline and date; merge "
+    "repetition. Do not produce any pre- or post-texts.\n\n"
+    "Notes so far:\n{notes}\n\nNew transcript:\n{text}"
+)
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _pieces(text, max_chars):
+    """Yield paragraph, sentence or (as a last resort) word-run pieces."""
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph, "\n\n"
+            continue
+        for sentence in _SENTENCE_RE.split(paragraph):
+            if len(sentence) <= max_chars:
+                yield sentence, " "
+                continue
+            words, size = [], 0
+            for word in sentence.split():
+                if words and size + len(word) + 1 > max_chars:
+                    yield " ".join(words), " "
+                    words, size = [], 0
+                words.append(word)
+                size += len(word) + 1
+            if words:
+                yield " ".join(words), " "
+        yield "", "\n\n"
+
+
+def split_into_chunks(text, max_tokens=CHUNK_TOKENS):
+    """Greedily pack boundary-aligned pieces into chunks of at most ``max_tokens``."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks, current, size = [], [], 0
+    for piece, separator in _pieces(text, max_chars):
+        if not piece:
+            if current and current[-1] != "\n\n":
+                current.append("\n\n")
+                size += 2
+            continue
+        if current and size + len(piece) > max_chars:
+            chunks.append("".join(current).strip())
+            current, size = [], 0
+        current.extend((piece, separator))
+        size += len(piece) + len(separator)
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+def _map(client, prompts, max_concurrency):
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        return list(pool.map(client, prompts))
+
+
+def reduce_summaries(client, summaries, max_tokens=CHUNK_TOKENS, max_concurrency=MAX_CONCURRENCY):
+    """Merge partial summaries until they fit in one ``max_tokens`` budget."""
+    combined = "\n\n".join(summaries)
+    while estimate_tokens(combined) > max_tokens and len(summaries) > 1:
+        groups = split_into_chunks(combined, max_tokens)
+        if len(groups) >= len(summaries):
+            # Each summary already fills a chunk; merge them pairwise instead.
+            groups = ["\n\n".join(summaries[i:i + 2]) for i in range(0, len(summaries), 2)]
+        summaries = _map(client, [REDUCE_PROMPT.format(text=group) for group in groups], max_concurrency)
+        combined = "\n\n".join(summaries)
+    return combined
+
+
+def summarize(text, client, final_prompt, single_pass_tokens=SINGLE_PASS_TOKENS,
+              chunk_tokens=CHUNK_TOKENS, max_concurrency=MAX_CONCURRENCY, final_client=None):
+    """Return ``client(final_prompt(notes))`` where notes fit the context.
+
+    ``final_prompt`` turns the (possibly condensed) text into the MOM prompt.
+    ``final_client`` (e.g. a streaming call) is used for that last request only.
+    """
+    final_client = final_client or client
+    if estimate_tokens(text) <= single_pass_tokens:
+        return final_client(final_prompt(text))
+    chunks = split_into_chunks(text, chunk_tokens)
+    prompts = [MAP_PROMPT.format(part=i + 1, total=len(chunks), text=chunk)
+               for i, chunk in enumerate(chunks)]
+    partials = _map(client, prompts, max_concurrency)
+    notes = reduce_summaries(client, partials, single_pass_tokens, max_concurrency)
+    return final_client(final_prompt(notes))
+
+
+def update_summary(notes, text, client, chunk_tokens=CHUNK_TOKENS):
+    """Fold ``text`` into the running ``notes``; cost depends on the new text only."""
+    for chunk in split_into_chunks(text, chunk_tokens):
+        notes = client(ROLLING_PROMPT.format(notes=notes or "(none yet)", text=chunk))
+    return notes
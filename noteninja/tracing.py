@@ -0,0 +1,180 @@
+"""Lightweight pipeline tracing.
+
+Wrap a stage in ``with span("stage", bytes_in=...) as s:`` and attach more
+attributes with ``s.set(...)``. Finished spans are kept in a bounded
+in-process buffer (shared by all sessions) for the profiling page, can be
+appended to a JSON-lines file (``NOTENINJA_TRACE_FILE``), and are exported as
+Prometheus text. Counters in that export are cumulative per-stage totals kept
+since process start; values computed from the buffer are gauges.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+MAX_SPANS = 20_000
+QUANTILES = (0.5, 0.9, 0.99)
+NUMERIC_ATTRS = ("bytes_in", "bytes_out", "tokens_in", "tokens_out")
+
+_current = contextvars.ContextVar("noteninja_span", default=None)
+
+
+class Span:
+    __slots__ = ("stage", "parent", "start", "duration_s", "attrs", "error")
+
+    def __init__(self, stage, parent, attrs):
+        self.stage = stage
+        self.parent = parent
+        self.start = time.time()
+        self.duration_s = None
+        self.attrs = attrs
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def as_dict(self):
+        return {"stage": self.stage, "parent": self.parent, "start": self.start,
+                "duration_s": self.duration_s, "error": self.error, **self.attrs}
+
+
+class Tracer:
+    def __init__(self, max_spans=MAX_SPANS, sink_path=None):
+        self.spans = deque(maxlen=max_spans)
+        self.sink_path = sink_path
+        self.totals = {}            # stage -> cumulative count, sum_s, errors and NUMERIC_ATTRS
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        parent = _current.get()
+        current = Span(stage, parent.stage if parent else None, attrs)
+        token = _current.set(current)
+        started = time.perf_counter()
+        try:
+            yield current
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            current.error = type(e).__name__
+            raise
+        finally:
+            current.duration_s = time.perf_counter() - started
+            try:
+                _current.reset(token)
+            except ValueError:
+                # Generator spans may be closed from another context.
+                _current.set(parent)
+            self._finish(current)
+
+    def _finish(self, span):
+        with self._lock:
+            self.spans.append(span)
+            totals = self.totals.setdefault(span.stage, dict.fromkeys(("count", "sum_s", "errors", *NUMERIC_ATTRS), 0))
+            totals["count"] += 1
+            totals["sum_s"] += span.duration_s
+            totals["errors"] += bool(span.error)
+            for attr in NUMERIC_ATTRS:
+                totals[attr] += span.attrs.get(attr) or 0
+            if self.sink_path:
+                with open(self.sink_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span.as_dict(), default=str) + "\n")
+
+    def recent(self, window_s=None):
+        with self._lock:
+            spans = list(self.spans)
+        if window_s is None:
+            return spans
+        cutoff = time.time() - window_s
+        return [s for s in spans if s.start >= cutoff]
+
+    # --- Aggregation ---
+    def stage_stats(self, window_s=None):
+        """Per-stage count, latency percentiles, byte/token totals and cache hit rate."""
+        by_stage = {}
+        for s in self.recent(window_s):
+            by_stage.setdefault(s.stage, []).append(s)
+        stats = {}
+        for stage, spans in sorted(by_stage.items()):
+            durations = np.fromiter((s.duration_s for s in spans), dtype=np.float64, count=len(spans))
+            entry = {
+                "count": len(spans),
+                "errors": sum(1 for s in spans if s.error),
+                "mean_s": float(durations.mean()),
+                "sum_s": float(durations.sum()),
+            }
+            for q, value in zip(QUANTILES, np.quantile(durations, QUANTILES)):
+                entry[f"p{int(q * 100)}_s"] = float(value)
+            for attr in NUMERIC_ATTRS:
+                total = sum(s.attrs.get(attr) or 0 for s in spans)
+                if total:
+                    entry[attr] = total
+            lookups = [s.attrs["cache_hit"] for s in spans if "cache_hit" in s.attrs]
+            if lookups:
+                entry["cache_hit_rate"] = sum(lookups) / len(lookups)
+            stats[stage] = entry
+        return stats
+
+    # --- Export ---
+    def to_jsonl(self, window_s=None):
+        return "".join(json.dumps(s.as_dict(), default=str) + "\n" for s in self.recent(window_s))
+
+    def to_prometheus(self, window_s=None):
+        """Quantiles, recent totals and the cache hit ratio cover the buffer
+        (or ``window_s``); ``_sum``, ``_count`` and ``*_total`` never decrease."""
+        with self._lock:
+            totals = {stage: dict(entry) for stage, entry in sorted(self.totals.items())}
+        stats = self.stage_stats(window_s)
+        lines = [
+            "# HELP noteninja_stage_duration_seconds Time spent per pipeline stage.",
+            "# TYPE noteninja_stage_duration_seconds summary",
+        ]
+        for stage, total in totals.items():
+            if stage in stats:
+                for q in QUANTILES:
+                    lines.append(f'noteninja_stage_duration_seconds{{stage="{stage}",quantile="{q}"}} '
+                                 f'{stats[stage][f"p{int(q * 100)}_s"]:.6f}')
+            lines.append(f'noteninja_stage_duration_seconds_sum{{stage="{stage}"}} {total["sum_s"]:.6f}')
+            lines.append(f'noteninja_stage_duration_seconds_count{{stage="{stage}"}} {total["count"]}')
+        for attr in NUMERIC_ATTRS:
+            lines.append(f"# TYPE noteninja_stage_{attr}_total counter")
+            for stage, total in totals.items():
+                if total[attr]:
+                    lines.append(f'noteninja_stage_{attr}_total{{stage="{stage}"}} {total[attr]}')
+        lines.append("# TYPE noteninja_stage_errors_total counter")
+        for stage, total in totals.items():
+            lines.append(f'noteninja_stage_errors_total{{stage="{stage}"}} {total["errors"]}')
+        # Windowed values can go down as spans age out, so they are gauges.
+        for attr in NUMERIC_ATTRS:
+            lines.append(f"# TYPE noteninja_stage_{attr}_recent gauge")
+            for stage, entry in stats.items():
+                if attr in entry:
+                    lines.append(f'noteninja_stage_{attr}_recent{{stage="{stage}"}} {entry[attr]}')
+        lines.append("# TYPE noteninja_stage_errors_recent gauge")
+        for stage, entry in stats.items():
+            lines.append(f'noteninja_stage_errors_recent{{stage="{stage}"}} {entry["errors"]}')
+        lines.append("# TYPE noteninja_stage_cache_hit_ratio gauge")
+        for stage, entry in stats.items():
+            if "cache_hit_rate" in entry:
+                lines.append(f'noteninja_stage_cache_hit_ratio{{stage="{stage}"}} {entry["cache_hit_rate"]:.4f}')
+        return "\n".join(lines) + "\n"
+
+
+_tracer = Tracer(sink_path=os.environ.get("NOTENINJA_TRACE_FILE"))
+
+
+def get_tracer():
+    return _tracer
+
+
+def span(stage, **attrs):
+    return _tracer.span(stage, **attrs)
+
+
+def current_span():
+    return _current.get()
@@ -0,0 +1,308 @@
+"""Segmenting, parallel transcription for long recordings.
+
+Audio is split on silence (or at a fixed window with overlap when no pause is
+found), segments are sent through a bounded thread pool to a pluggable
+recognizer backend, and the partial transcripts are stitched back in order.
+Optionally the audio is diarized first and the text labelled by speaker.
+"""
+import re
+import wave
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+
+import numpy as np
+
+from noteninja.audio_io import downmix, read_wav
+from noteninja.diarize import format_turns
+from noteninja.tracing import span
+
+# --- Defaults ---
+FRAME_MS = 30             # analysis frame used for silence detection
+MAX_SEGMENT_S = 30.0      # longest segment sent in one recognizer call
+MIN_SEGMENT_S = 10.0      # do not cut on silence before this point
+OVERLAP_S = 1.0           # overlap added when a segment has to be hard-cut
+SILENCE_OFFSET_DB = 16.0  # frames this far below the file loudness are silence
+MIN_SILENCE_MS = 300      # shortest pause we are willing to cut on
+MAX_WORKERS = 4
+MAX_OVERLAP_WORDS = 12
+
+
+@dataclass
+class Segment:
+    index: int
+    start: int            # first frame (inclusive)
+    end: int              # last frame (exclusive)
+    overlapped: bool      # starts inside the previous segment's tail
+    sample_rate: int
+    data: bytes = b""     # mono int16 PCM (bytes or memoryview)
+
+    @property
+    def start_s(self):
+        return self.start / self.sample_rate
+
+    @property
+    def end_s(self):
+        return self.end / self.sample_rate
+
+
+# --- Audio sources ---
+def _to_mono_int16(raw, sample_width, channels):
+    if sample_width == 2:
+        samples = np.frombuffer(raw, dtype="<i2")
+    elif sample_width == 1:
+        samples = ((np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128) << 8)
+    elif sample_width == 3:
+        # 24-bit little-endian: the top two bytes of each sample are its int16 value.
+        samples = np.ascontiguousarray(np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)[:, 1:]).view("<i2").reshape(-1)
+    elif sample_width == 4:
+        samples = (np.frombuffer(raw, dtype="<i4") >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples
+
+
+class WavSource:
+    """Random access to a WAV file as mono int16 without loading it whole.
+
+    Encodings the ``wave`` module rejects (IEEE float, extensible headers)
+    are decoded in memory with ``audio_io.read_wav`` instead.
+    """
+
+    def __init__(self, audio_file):
+        self._samples = None
+        try:
+            self._wav = wave.open(audio_file, "rb")
+        except wave.Error:
+            self._wav = None
+            if isinstance(audio_file, str):
+                with open(audio_file, "rb") as f:
+                    data = f.read()
+            else:
+                audio_file.seek(0)
+                data = audio_file.read()
+            frames, self.sample_rate, self.channels = read_wav(data)
+            self._samples = downmix(frames)
+            self.sample_width = 2
+            self.n_frames = len(self._samples)
+            return
+        self.sample_rate = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        self.sample_width = self._wav.getsampwidth()
+        self.n_frames = self._wav.getnframes()
+
+    def read(self, start, end):
+        if self._samples is not None:
+            return self._samples[start:end]
+        self._wav.setpos(start)
+        raw = self._wav.readframes(end - start)
+        return _to_mono_int16(raw, self.sample_width, self.channels)
+
+    def iter_blocks(self, block_frames):
+        for start in range(0, self.n_frames, block_frames):
+            yield self.read(start, min(start + block_frames, self.n_frames))
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- Recognizer backends ---
+class GoogleRecognizerBackend:
+    """Sends each segment to the free Google Web Speech API."""
+
+    def __init__(self, recognizer=None, language="en-US"):
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+
+    def transcribe(self, segment):
+        audio = self._sr.AudioData(segment.data, segment.sample_rate, 2)
+        with span("recognize_google", bytes_in=len(segment.data),
+                  audio_s=round(segment.end_s - segment.start_s, 3)) as active:
+            try:
+                text = self.recognizer.recognize_google(audio, language=self.language)
+            except self._sr.UnknownValueError:
+                text = ""
+            active.set(bytes_out=len(text))
+            return text
+
+
+# --- Segmentation ---
+def frame_energies(source, frame_ms=FRAME_MS):
+    """RMS level of every analysis frame, computed block by block."""
+    frame_len = max(1, source.sample_rate * frame_ms // 1000)
+    block_frames = frame_len * 1000
+    energies = []
+    for block in source.iter_blocks(block_frames):
+        usable = len(block) - len(block) % frame_len
+        if usable:
+            frames = block[:usable].astype(np.float32).reshape(-1, frame_len)
+            energies.append(np.sqrt(np.mean(frames * frames, axis=1)))
+        if usable < len(block):
+            tail = block[usable:].astype(np.float32)
+            energies.append(np.array([np.sqrt(np.mean(tail * tail))], dtype=np.float32))
+    if not energies:
+        return np.zeros(0, dtype=np.float32), frame_len
+    return np.concatenate(energies), frame_len
+
+
+def plan_segments(energies, frame_len, sample_rate, n_frames,
+                  max_segment_s=MAX_SEGMENT_S, min_segment_s=MIN_SEGMENT_S,
+                  overlap_s=OVERLAP_S, silence_offset_db=SILENCE_OFFSET_DB,
+                  min_silence_ms=MIN_SILENCE_MS):
+    """Return (start, end, overlapped) frame ranges covering the recording.
+
+    Cuts are placed in the middle of the last long-enough pause between
+    ``min_segment_s`` and ``max_segment_s``; if there is none the segment is
+    cut at ``max_segment_s`` and the next one starts ``overlap_s`` earlier.
+    """
+    if n_frames == 0:
+        return []
+    loudness = float(np.sqrt(np.mean(energies.astype(np.float64) ** 2))) if len(energies) else 0.0
+    threshold = loudness * 10 ** (-silence_offset_db / 20)
+    silent = energies <= threshold
+
+    max_len = int(max_segment_s * sample_rate)
+    min_len = int(min_segment_s * sample_rate)
+    overlap = int(overlap_s * sample_rate)
+    min_run = max(1, int(min_silence_ms * sample_rate / 1000) // frame_len)
+
+    plan = []
+    start, overlapped = 0, False
+    while start < n_frames:
+        if n_frames - start <= max_len:
+            plan.append((start, n_frames, overlapped))
+            break
+        lo = (start + min_len) // frame_len
+        hi = min((start + max_len) // frame_len, len(silent))
+        cut = _last_pause_centre(silent, lo, hi, min_run)
+        if cut is not None:
+            end = cut * frame_len
+            plan.append((start, end, overlapped))
+            start, overlapped = end, False
+        else:
+            end = start + max_len
+            plan.append((start, end, overlapped))
+            start, overlapped = max(end - overlap, start + 1), overlap > 0
+    return plan
+
+
+def _last_pause_centre(silent, lo, hi, min_run):
+    window = silent[lo:hi]
+    if not window.any():
+        return None
+    # Boundaries of runs of silent frames inside the window.
+    padded = np.concatenate(([False], window, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = edges[::2], edges[1::2]
+    long_runs = np.flatnonzero(ends - starts >= min_run)
+    if not len(long_runs):
+        return None
+    run = long_runs[-1]
+    return lo + int((starts[run] + ends[run]) // 2)
+
+
+# --- Stitching ---
+_WORD_RE = re.compile(r"[^\w']+")
+
+
+def _norm(word):
+    return _WORD_RE.sub("", word.lower())
+
+
+def stitch_transcripts(texts, overlapped, max_overlap_words=MAX_OVERLAP_WORDS):
+    """Join segment transcripts, dropping words repeated across overlaps."""
+    words = []
+    for text, has_overlap in zip(texts, overlapped):
+        new_words = text.split()
+        if has_overlap and words and new_words:
+            limit = min(max_overlap_words, len(words), len(new_words))
+            tail = [_norm(w) for w in words[-limit:]]
+            head = [_norm(w) for w in new_words[:limit]]
+            for k in range(limit, 0, -1):
+                if tail[-k:] == head[:k]:
+                    new_words = new_words[k:]
+                    break
+        words.extend(new_words)
+    return " ".join(words)
+
+
+# --- Engine ---
+def transcribe_source(source, backend, max_workers=MAX_WORKERS, regions=None, diarizer=None, **plan_options):
+    """Transcribe an open audio source with ``backend`` and return the text.
+
+    ``regions`` optionally limits recognition to (start, end) sample ranges,
+    e.g. the speech segments found by ``noteninja.vad``. With a ``diarizer``
+    (``noteninja.diarize.Diarizer``) segments are cut at speaker turns and the
+    text is returned as "Speaker N: ..." lines. At most ``2 * max_workers``
+    segments are held in memory at a time.
+    """
+    energies, frame_len = frame_energies(source)
+    turns = None
+    if diarizer is not None:
+        with span("diarize", audio_s=round(source.n_frames / source.sample_rate, 3)) as active:
+            turns = diarizer.turns(source, regions)
+            active.set(turns=len(turns))
+        regions = [(turn.start, turn.end) for turn in turns]
+    if regions is None:
+        regions = [(0, source.n_frames)]
+    plan = []
+    for region, (region_start, region_end) in enumerate(regions):
+        first, last = region_start // frame_len, -(-region_end // frame_len)
+        for start, end, overlapped in plan_segments(energies[first:last], frame_len, source.sample_rate,
+                                                    region_end - region_start, **plan_options):
+            plan.append((region_start + start, region_start + end, overlapped, region))
+    texts = [""] * len(plan)
+    in_flight = {}
+
+    def collect(done):
+        for future in done:
+            texts[in_flight.pop(future)] = future.result().strip()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for index, (start, end, overlapped, _) in enumerate(plan):
+            if len(in_flight) >= 2 * max_workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            samples = np.ascontiguousarray(source.read(start, end))
+            segment = Segment(index, start, end, overlapped, source.sample_rate,
+                              memoryview(samples).cast("B"))
+            in_flight[pool.submit(backend.transcribe, segment)] = index
+        collect(wait(in_flight).done)
+
+    if turns is None:
+        return stitch_transcripts(texts, [p[2] for p in plan])
+    per_turn = [([], []) for _ in turns]
+    for text, (_, _, overlapped, region) in zip(texts, plan):
+        per_turn[region][0].append(text)
+        per_turn[region][1].append(overlapped)
+    return format_turns((turn, stitch_transcripts(*parts)) for turn, parts in zip(turns, per_turn))
+
+
+def transcribe_file(audio_file, backend=None, max_workers=MAX_WORKERS, vad=False, diarizer=None, **plan_options):
+    """Transcribe a WAV path or file object, defaulting to Google recognition.
+
+    With ``vad=True`` non-speech spans are skipped before recognition; a
+    ``diarizer`` labels the text by speaker (see ``transcribe_source``).
+    """
+    backend = backend or GoogleRecognizerBackend()
+    with WavSource(audio_file) as source:
+        regions = speech_regions(source) if vad else None
+        return transcribe_source(source, backend, max_workers=max_workers, regions=regions,
+                                 diarizer=diarizer, **plan_options)
+
+
+def speech_regions(source):
+    from noteninja.vad import detect_speech, speech_ratio
+    segments = detect_speech(source)
+    print(f"Voice activity: {speech_ratio(segments, source.n_frames):.0%} of the audio is speech")
+    return [(segment.start, segment.end) for segment in segments]
@@ -0,0 +1,122 @@
+"""Energy + zero-crossing voice-activity detection on int16 audio.
+
+Features are computed per 30 ms frame with NumPy, one block at a time, so the
+pass is linear in duration with bounded memory. Speech starts when a frame is
+clearly above the noise floor (and not noise-like by zero-crossing rate) and
+continues until the level drops below a lower threshold (hysteresis). Short
+gaps are bridged, short blips dropped and each region padded.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+# --- Defaults ---
+FRAME_MS = 30
+START_DB = 10.0        # above the noise floor to start a speech region
+STOP_DB = 5.0          # below this (above floor) a region ends
+ABSOLUTE_GATE_DB = -55.0
+MAX_ZCR = 0.35         # crossings per sample; higher is treated as noise
+MIN_SPEECH_MS = 250
+MIN_GAP_MS = 400
+PADDING_MS = 200
+BLOCK_FRAMES = 2000
+
+
+@dataclass
+class SpeechSegment:
+    start: int            # first sample (inclusive)
+    end: int              # last sample (exclusive)
+    sample_rate: int
+
+    @property
+    def start_s(self):
+        return self.start / self.sample_rate
+
+    @property
+    def end_s(self):
+        return self.end / self.sample_rate
+
+
+def frame_features(source, frame_ms=FRAME_MS):
+    """Return (level_db, zcr, frame_len) for every complete frame of ``source``."""
+    frame_len = max(1, source.sample_rate * frame_ms // 1000)
+    levels, crossings = [], []
+    for block in source.iter_blocks(frame_len * BLOCK_FRAMES):
+        usable = len(block) - len(block) % frame_len
+        if not usable:
+            continue
+        frames = block[:usable].reshape(-1, frame_len)
+        as_float = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(as_float * as_float, axis=1))
+        levels.append(20 * np.log10(np.maximum(rms, 1.0) / 32768.0))
+        signs = np.signbit(frames)
+        crossings.append(np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len)
+    if not levels:
+        return np.zeros(0, np.float32), np.zeros(0, np.float32), frame_len
+    return (np.concatenate(levels).astype(np.float32),
+            np.concatenate(crossings).astype(np.float32), frame_len)
+
+
+def speech_mask(level_db, zcr, start_db=START_DB, stop_db=STOP_DB,
+                absolute_gate_db=ABSOLUTE_GATE_DB, max_zcr=MAX_ZCR):
+    """Per-frame speech/non-speech decision with hysteresis."""
+    n = len(level_db)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    floor = float(np.percentile(level_db, 10))
+    loud = level_db > absolute_gate_db
+    if float(np.percentile(level_db, 95)) - floor < start_db:
+        # No usable dynamic range (continuous talk or constant noise): keep
+        # everything above the absolute gate rather than dropping speech.
+        return loud
+    state = np.full(n, -1, dtype=np.int8)
+    state[level_db < floor + stop_db] = 0
+    state[(level_db >= floor + start_db) & (zcr <= max_zcr) & loud] = 1
+    # Frames between the thresholds inherit the last decided state.
+    decided = np.where(state >= 0, np.arange(n), 0)
+    np.maximum.accumulate(decided, out=decided)
+    mask = state[decided] == 1
+    return mask & loud
+
+
+def mask_to_segments(mask, frame_len, sample_rate, n_samples, min_speech_ms=MIN_SPEECH_MS,
+                     min_gap_ms=MIN_GAP_MS, padding_ms=PADDING_MS):
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = edges[::2] * frame_len, edges[1::2] * frame_len
+    if not len(starts):
+        return []
+    min_gap = int(min_gap_ms * sample_rate / 1000)
+    keep = np.concatenate(([True], starts[1:] - ends[:-1] > min_gap))
+    group = np.cumsum(keep) - 1
+    merged_starts = starts[keep]
+    merged_ends = np.zeros(len(merged_starts), dtype=ends.dtype)
+    np.maximum.at(merged_ends, group, ends)
+
+    min_speech = int(min_speech_ms * sample_rate / 1000)
+    padding = int(padding_ms * sample_rate / 1000)
+    segments = []
+    for start, end in zip(merged_starts, merged_ends):
+        if end - start < min_speech:
+            continue
+        start, end = max(int(start) - padding, 0), min(int(end) + padding, n_samples)
+        if segments and start <= segments[-1].end:
+            segments[-1].end = end
+        else:
+            segments.append(SpeechSegment(start, end, sample_rate))
+    return segments
+
+
+def detect_speech(source, frame_ms=FRAME_MS, **options):
+    """Speech regions of ``source`` (an audio source with ``iter_blocks``)."""
+    mask_options = {k: options.pop(k) for k in ("start_db", "stop_db", "absolute_gate_db", "max_zcr")
+                    if k in options}
+    level_db, zcr, frame_len = frame_features(source, frame_ms)
+    mask = speech_mask(level_db, zcr, **mask_options)
+    return mask_to_segments(mask, frame_len, source.sample_rate, source.n_frames, **options)
+
+
+def speech_ratio(segments, n_samples):
+    if not n_samples:
+        return 0.0
+    return sum(s.end - s.start for s in segments) / n_samples
@@ -1,333 +1,308 @@
-import streamlit as st
-import google.generativeai as genai
-import speech_recognition as sr
-import numpy as np
-import os
-import wave
-import sounddevice as sd
-import threading
-import queue
-from audio_recorder_streamlit import audio_recorder
-import re
-from datetime import date
-from fpdf import FPDF
-import io
-from pypdf import PdfReader
-import docx
-import unicodedata
-
-# --- API Keys and Setup ---
-API_KEY = st.secrets["GOOGLE_API_KEY"]
-MODEL_NAME = "gemini-2.0-flash-exp"
-
-genai.configure(api_key=API_KEY)
-model = genai.GenerativeModel(MODEL_NAME)
-
-# --- Audio Recording Setup ---
-SAMPLE_RATE = 44100
-CHANNELS = 2
-CHUNK_SIZE = 1024
-OUTPUT_FILE = "recorded_audio.wav"
-
-# --- Global Variables ---
-audio_queue = queue.Queue()
-stop_event = threading.Event()
-recording_thread = None
-
-# --- Gemini AI Functions ---
-def generate_text(prompt):
-    try:
-        response = model.generate_content(prompt)
-        return response.text if response else "Error: No response generated."
-    except Exception as e:
-        return f"Error: {e}"
-
-# --- Audio Recording Function (System Audio) ---
-def audio_recording_sounddevice(audio_queue, event, channels):
-    try:
-        print("Recording system audio using sounddevice (default output device)...")
-        default_output_device = sd.query_devices(kind='output')
-
-        with sd.RawInputStream(samplerate=SAMPLE_RATE, device=default_output_device['index'], channels=channels, dtype='int16') as stream:
-            while event.is_set():
-                audio_chunk, overflowed = stream.read(CHUNK_SIZE)
-                if not overflowed:
-                    audio_queue.put(audio_chunk.tobytes())
-    except Exception as e:
-        print(f"Error recording audio: {e}")
-        return None
-    
-# --- Audio Conversion function
-def convert_mp3_to_wav(audio_file, output_file):
-    try:
-        from pydub import AudioSegment
-        sound = AudioSegment.from_mp3(audio_file)
-        sound.export(output_file, format = "wav")
-    except Exception as e:
-      print(f"Error processing audio {e}")
-
-# --- Speech Recognition (Transcription) ---
-def transcribe_audio(audio_file):
-    recognizer = sr.Recognizer()
-    try:
-        with sr.AudioFile(audio_file) as source:
-            print("Transcribing audio...")
-            audio = recognizer.record(source)
-    except Exception as e:
-        print(f"Transcription error {e}")
-        return None
-    try:
-        text = recognizer.recognize_google(audio)  # Uses Google API
-        print("Transcription Completed.")
-        print("\nTranscribed Text:\n", text)
-        return text
-    except sr.UnknownValueError:
-        print("Speech Recognition could not understand the audio.")
-        return "Speech Recognition could not understand the audio."
-    except sr.RequestError:
-        print("Could not request results from Google Speech Recognition.")
-        return "Could not request results from Google Speech Recognition."
-
-# --- Prompt Engineering for Audio ---
-def prepare_mom_prompt_audio(transcript):
-    today = date.today().strftime("%Y-%m-%d")
-    date_pattern = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')  # check for YYYY-MM-DD
-    match = date_pattern.search(transcript)
-    if match:
-        date_found = match.group(1)
-    else:
-        date_found = today
-
-    prompt = (
-        f"Prepare a MOM (Minutes of Meeting) for the following transcript in a suitable format. "
-        f"Date: {date_found}. "
-        f"Do not produce any pre- or post-texts. Generate insights based on the content logically. Keep it as concise as possible. "
-        f"Remove all unnecessary symbols or formatting: {transcript}"
-    )
-    return prompt
-
-# --- Prompt Engineering for Files ---
-def prepare_mom_prompt_files(transcript):
-    today = date.today().strftime("%Y-%m-%d")
-    date_pattern = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')  # check for YYYY-MM-DD
-    match = date_pattern.search(transcript)
-    if match:
-        date_found = match.group(1)
-    else:
-        date_found = today
-
-    prompt = (
-        f"Provide a summary of the meeting in a suitable format. "
-        f"Date: {date_found}. "
-        f"Do not produce any pre- or post-texts. Summarize key insights logically. "
-        f"Remove all unnecessary symbols or formatting: {transcript}"
-    )
-    return prompt
-
-# --- PDF Generation Function for Audio ---
-def generate_pdf_from_string_audio(input_string, filename="output.pdf"):
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    pdf.multi_cell(0, 10, input_string)
-    pdf_bytes = pdf.output(dest="S").encode('latin-1')
-    return pdf_bytes
-
-
-# --- PDF Generation Function for Files ---
-def generate_pdf_from_string_files(input_string, filename="output.pdf"):
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-
-    # Use a standard font with UTF-8 support
-    pdf.add_font("Arial", "", "Arial.ttf", uni=True)  # Ensure arial.ttf is in your project directory
-    pdf.set_font("Arial", size=12)
-
-    # Replace unsupported characters and clean text
-    cleaned_text = input_string.encode('latin-1', 'ignore').decode('latin-1')  
-
-    # Add text to PDF
-    if cleaned_text.strip():  # Avoid blank pages
-        pdf.multi_cell(0, 10, cleaned_text)
-    else:
-        pdf.multi_cell(0, 10, "Error: No valid content to display.")
-
-    # Return the PDF as bytes
-    pdf_bytes = pdf.output(dest="S").encode('latin-1')
-    return pdf_bytes
-    
-# --- Extract text from PDF file ---
-def extract_text_from_pdf(uploaded_file):
-    pdf_reader = PdfReader(uploaded_file)
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
-
-# --- Extract text from DOC file ---
-def extract_text_from_doc(uploaded_file):
-    doc = docx.Document(uploaded_file)
-    fullText = []
-    for para in doc.paragraphs:
-        fullText.append(para.text)
-    return '\n'.join(fullText)
-
-# --- Normalize the extracted text by merging all the lines ---
-def normalize_text(text):
-      lines = text.splitlines()
-      return " ".join(line.strip() for line in lines)
-
-# --- Streamlit UI ---
-def main():
-    global recording_thread
-    global stop_event
-    st.markdown("<h1 style='font-family: Arial, sans-serif;'>🎙 NoteNinja M.O.M Generator 📝 <span style='font-size:0.7em;'> (No Puns Intended)</span></h1>", unsafe_allow_html = True)
-
-    audio_input_type = st.radio("Select Audio Input:", ("Microphone", "System Audio"))
-    if audio_input_type == "Microphone":
-        st.success("Click the button below to start the recording and then press again to stop the recording and process the audio (It may need the second click after you allow access to your microphone):")
-        audio_bytes = audio_recorder(pause_threshold=1000.0, sample_rate=41_000)
-        if audio_bytes:
-            try:
-                with open(OUTPUT_FILE, "wb") as f:
-                    f.write(audio_bytes)
-                st.audio(audio_bytes, format="audio/wav")
-                with st.spinner("Processing Audio"):
-                    transcript = transcribe_audio(OUTPUT_FILE)
-                    if transcript:
-                        mom_prompt = prepare_mom_prompt_audio(transcript)
-                        result = generate_text(mom_prompt)
-                        st.write("\nGenerated MOM:\n", result)
-                        pdf_file = generate_pdf_from_string_audio(result)
-                        st.download_button(
-                            label="Download MOM as PDF",
-                             data = pdf_file,
-                            file_name = "mom.pdf",
-                            mime = "application/pdf",
-                            key="audio_download"
-                            )
-                    else:
-                        st.write("No transcript found.")
-            except Exception as e:
-                st.write(f"An error has occurred during audio processing: {e}")
-    elif audio_input_type == "System Audio":
-      audio_source = st.radio("Select System Audio Source:", ("Upload Audio File", "System Recording"), horizontal = True)
-      if audio_source == "System Recording":
-        st.warning('''WARNING : This feature may not work on devices lacking Loopback. 
-        
-        You need to use a Virtual Audio Cable for inputting system audio.''')
-        start_recording = st.button("Start Recording")
-        stop_recording = st.button("Stop Recording and Process")
-        transcript_chunks = []
-        if start_recording:
-              if recording_thread and recording_thread.is_alive():
-                  st.write("Already recording...")
-              else:
-                  st.write("Starting the recording")
-                  stop_event.clear()
-                  default_output_device = sd.query_devices(kind='output')
-                  channels = default_output_device['max_output_channels']
-                  recording_thread = threading.Thread(target=audio_recording_sounddevice, args=(audio_queue, stop_event, channels))
-                  recording_thread.start()
-
-        if stop_recording:
-              if recording_thread and recording_thread.is_alive():
-                   stop_event.set()
-                   recording_thread.join()
-              with st.spinner("Processing Audio...."):
-                   try:
-                        with wave.open(OUTPUT_FILE, 'wb') as wf:
-                            wf.setnchannels(CHANNELS)
-                            wf.setsampwidth(2)
-                            wf.setframerate(SAMPLE_RATE)
-                            while not audio_queue.empty():
-                                audio_data = audio_queue.get()
-                                wf.writeframes(audio_data)
-
-                        transcript = transcribe_audio(OUTPUT_FILE)
-                        if transcript:
-                              mom_prompt = prepare_mom_prompt_audio(transcript)
-                              result = generate_text(mom_prompt)
-                              st.write("\nGenerated MOM:\n", result)
-                              pdf_file = generate_pdf_from_string_audio(result)
-                              st.download_button(
-                                 label="Download MOM as PDF",
-                                data = pdf_file,
-                                 file_name = "mom.pdf",
-                                 mime = "application/pdf",
-                                 key="system_audio_download"
-                               )
-                        else:
-                           st.write("No transcript found.")
-                   except Exception as e:
-                        st.write(f"An error has occurred during audio processing: {e}")
-
-      elif audio_source == "Upload Audio File":
-          st.success("Please upload supported files only (MP3/WAV Files).")
-          uploaded_audio = st.file_uploader("Upload Audio File", type = ["mp3", "wav"])
-          if uploaded_audio:
-             try:
-                  with st.spinner("Processing Audio file"):
-                        if uploaded_audio.name.lower().endswith(".mp3"):
-                           convert_mp3_to_wav(uploaded_audio, OUTPUT_FILE)
-                           transcript = transcribe_audio(OUTPUT_FILE)
-                        elif uploaded_audio.name.lower().endswith(".wav"):
-                          with open (OUTPUT_FILE, 'wb') as f:
-                              f.write(uploaded_audio.getvalue())
-                          transcript = transcribe_audio(OUTPUT_FILE)
-
-                        else:
-                           st.write("Please upload a file that ends in either `.mp3` or `.wav`")
-                           return
-
-                        if transcript:
-                           mom_prompt = prepare_mom_prompt_audio(transcript)
-                           result = generate_text(mom_prompt)
-                           st.write("\nGenerated MOM:\n", result)
-                           pdf_file = generate_pdf_from_string_audio(result)
-                           st.download_button(
-                                label = "Download MOM as PDF",
-                                 data = pdf_file,
-                                file_name = "mom.pdf",
-                                mime = "application/pdf",
-                                key="audio_file_download"
-                              )
-                        else:
-                              st.write("No transcript found")
-             except Exception as e:
-                    st.write(f"Error during audio file upload and transcription : {e}")
-            
-    st.markdown("---")
-    st.write("OR")
-    st.success("Upload a file to generate MOM (PDF Only)")
-
-    uploaded_file = st.file_uploader("Upload PDF file", type=["pdf"])
-
-    if uploaded_file is not None:
-          try:
-             if uploaded_file.name.lower().endswith(".pdf"):
-                 text = extract_text_from_pdf(uploaded_file)
-             else:
-                 st.write("Please upload a file that ends in '.pdf'")
-                 return
-             normalized_text = normalize_text(text)
-             mom_prompt = prepare_mom_prompt_files(normalized_text)
-             with st.spinner("Processing the file"):
-                 result = generate_text(mom_prompt)
-                 st.write("\nGenerated MOM:\n", result)
-                 pdf_file = generate_pdf_from_string_files(result)
-                 st.download_button(
-                  label="Download MOM as PDF",
-                 data = pdf_file,
-                 file_name = "mom.pdf",
-                 mime = "application/pdf",
-                 key="file_download"
-                )
-          except Exception as e:
-             st.write(f"Error: Could not process the file. {e}")
-
-
-if __name__ == "__main__":
-    main()
+import streamlit as st
+import threading
+import time
+from noteninja.capture import StreamingRecorder, get_profile
+from noteninja.archive import archive_meeting
+from noteninja.cache import get_default_cache, make_key
+from noteninja.diarize import Diarizer
+from noteninja.jobs import FAILED, Session, get_job_manager
+from noteninja.live import LiveMinutes
+from noteninja.pipeline import (
+    MODEL_NAME, TRANSCRIPTION_ERRORS, get_model, generate_text, extract_meeting_date,
+    transcribe_audio, transcribe_audio_bytes, prepare_mom_prompt_audio, prepare_mom_prompt_files, generate_mom_stream,
+    generate_pdf_from_string_audio, generate_pdf_from_string_files,
+)
+from noteninja.extractors import extract_many, extractor_for, supported_extensions
+
+# --- API Keys and Setup ---
+API_KEY = st.secrets["GOOGLE_API_KEY"]
+
+# One client per process: its rate limiter and connections outlive reruns.
+model = get_model(API_KEY, MODEL_NAME)
+
+# --- Audio Recording Setup ---
+# Audio is captured at the device's own rate and channel count and converted
+# to the capture profile (default 16 kHz mono, see NOTENINJA_CAPTURE_PROFILE).
+CAPTURE_PROFILE = get_profile()
+CHUNK_SIZE = 1024
+SEGMENT_SECONDS = 60
+JOB_POLL_INTERVAL = 0.1
+LIVE_POLL_INTERVAL = 1.0
+
+# --- Global Variables ---
+use_cache = True
+label_speakers = False
+result_cache = get_default_cache()
+job_manager = get_job_manager()
+
+# --- Per-Session State ---
+def get_session():
+    # Each browser session gets its own workspace, recording state and jobs.
+    if "noteninja_session" not in st.session_state:
+        st.session_state["noteninja_session"] = Session()
+    return st.session_state["noteninja_session"]
+
+# --- Result Cache ---
+def active_cache():
+    return result_cache if use_cache else None
+
+# --- Audio Recording Function (System Audio) ---
+# sounddevice and the microphone widget are imported only on the input path that uses them.
+def audio_recording_sounddevice(recorder, event, channels, sample_rate):
+    import sounddevice as sd
+    try:
+        print("Recording system audio using sounddevice (default output device)...")
+        default_output_device = sd.query_devices(kind='output')
+
+        with sd.RawInputStream(samplerate=sample_rate, device=default_output_device['index'], channels=channels, dtype='int16') as stream:
+            while not event.is_set():
+                audio_chunk, overflowed = stream.read(CHUNK_SIZE)
+                recorder.push(bytes(audio_chunk), overflowed)
+    except Exception as e:
+        print(f"Error recording audio: {e}")
+        return None
+
+# --- Background Jobs ---
+def segment_job(job, audio_path, cache, live, index, diarize):
+    transcript = None
+    try:
+        if audio_path.endswith(".wav"):
+            transcript = transcribe_audio(audio_path, cache, diarize=diarize)
+        else:
+            # FLAC/Opus segments (compressed capture profiles) are decoded in memory.
+            with open(audio_path, "rb") as f:
+                transcript = transcribe_audio_bytes(f.read(), audio_path, cache, diarize=diarize)
+    finally:
+        # Always report the segment, or every later one waits for it forever.
+        live.add(index, transcript if transcript not in TRANSCRIPTION_ERRORS else None)
+    return transcript
+
+def mom_from_transcript(job, transcript, cache, source, name, diarize):
+    # Error messages are not meetings: nothing is sent to Gemini, cached or archived.
+    if not transcript or transcript in TRANSCRIPTION_ERRORS:
+        return None
+    job.progress = "Generating MOM"
+    date_found = extract_meeting_date(transcript)
+    for piece in generate_mom_stream(transcript, prepare_mom_prompt_audio, model, job.metrics, cache, date_found):
+        job.stream.add(piece)
+    mom = job.stream.finish()
+    archive_meeting(transcript, job.stream.text, date_found, source, name, {"speakers": bool(diarize)})
+    return generate_pdf_from_string_audio(mom)
+
+def audio_job(job, data, file_name, source, cache, diarize):
+    # Decoded and resampled in memory; no temp WAV or pydub round-trip.
+    job.progress = "Transcribing audio"
+    transcript = transcribe_audio_bytes(data, file_name, cache, diarize=diarize)
+    return mom_from_transcript(job, transcript, cache, source, file_name, diarize)
+
+def recording_job(job, segment_jobs, live, cache):
+    # Segments were transcribed and summarised while recording; only the last
+    # segment and the final MOM request are left.
+    job.progress = "Transcribing the last segment"
+    for segment in segment_jobs:
+        segment.wait()
+    job.progress = "Generating MOM"
+    text = live.final_text()
+    live.close()
+    if not text:
+        return None
+    transcript = live.transcript
+    date_found = extract_meeting_date(transcript)
+    for piece in generate_mom_stream(text, prepare_mom_prompt_audio, model, job.metrics, cache, date_found):
+        job.stream.add(piece)
+    mom = job.stream.finish()
+    archive_meeting(transcript, job.stream.text, date_found, "system recording", "",
+                    {"segments": len(segment_jobs), "summary_refreshes": live.refreshes})
+    return generate_pdf_from_string_audio(mom)
+
+def document_job(job, files, cache):
+    job.progress = f"Extracting text from {len(files)} file(s)"
+    texts = extract_many(files, cache)
+    if len(files) == 1:
+        normalized_text = texts[0]
+    else:
+        normalized_text = " ".join(f"[{name}] {text}" for (name, _), text in zip(files, texts))
+    job.progress = "Generating MOM"
+    date_found = extract_meeting_date(normalized_text)
+    for piece in generate_mom_stream(normalized_text, prepare_mom_prompt_files, model, job.metrics, cache, date_found):
+        job.stream.add(piece)
+    mom = job.stream.finish()
+    archive_meeting(normalized_text, job.stream.text, date_found, "documents", ", ".join(name for name, _ in files))
+    return generate_pdf_from_string_files(mom)
+
+def job_kind(kind):
+    # Labelled and unlabelled runs of the same input are different jobs.
+    return f"{kind}-speakers" if label_speakers else kind
+
+def submit_once(session, kind, data, fn, *args):
+    # Reruns of the same input reuse the running/finished job instead of resubmitting.
+    key = make_key("job", kind, data)
+    job = session.jobs_by_input.get(key)
+    if job is None or job.status == FAILED:
+        job = job_manager.submit(session.id, kind, fn, *args)
+        session.jobs_by_input[key] = job
+    return job
+
+# --- Job Display ---
+def show_job(job, download_key, error_message):
+    status = st.empty()
+    st.write("\nGenerated MOM:\n")
+    placeholder = st.empty()
+    while not job.finished:
+        status.info(f"{job.progress}...")
+        if job.stream.pieces:
+            placeholder.write(job.stream.text)
+        time.sleep(JOB_POLL_INTERVAL)
+    status.empty()
+    if job.status == FAILED:
+        placeholder.write(f"{error_message}: {job.error}")
+        return
+    if job.result is None:
+        placeholder.write("No transcript found.")
+        return
+    placeholder.write(job.stream.text)
+    if job.metrics.first_token_s is not None:
+        st.caption(f"First token after {job.metrics.first_token_s:.2f}s, completed in {job.metrics.total_s:.2f}s")
+    st.download_button(
+        label="Download MOM as PDF",
+        data = job.result,
+        file_name = "mom.pdf",
+        mime = "application/pdf",
+        key=download_key
+    )
+
+def show_live(session):
+    # Rerun by the Stop button; until then keep the rolling transcript/notes fresh.
+    status = st.empty()
+    notes = st.empty()
+    with st.expander("Live transcript", expanded=False):
+        transcript = st.empty()
+    while session.recording_thread and session.recording_thread.is_alive():
+        live = session.live
+        recorded = session.recorder.stats()["elapsed_s"] if session.recorder else 0
+        updated = time.strftime("%H:%M:%S", time.localtime(live.updated_at)) if live.updated_at else "not yet"
+        status.info(f"Recording... {int(recorded) // 60:02d}:{int(recorded) % 60:02d} captured, "
+                    f"{live.segments} segment(s) transcribed, notes updated: {updated}")
+        if live.notes:
+            notes.markdown(live.notes)
+        transcript.write(live.transcript or "Waiting for the first segment...")
+        time.sleep(LIVE_POLL_INTERVAL)
+
+def show_job_sidebar(session):
+    jobs = job_manager.jobs(session.id)
+    if not jobs:
+        return
+    with st.sidebar.expander("Background jobs", expanded=False):
+        for job in sorted(jobs, key=lambda j: j.submitted_at, reverse=True):
+            st.write(f"`{job.kind}` — {job.status} ({job.progress})")
+
+# --- Streamlit UI ---
+def main():
+    global use_cache, label_speakers
+    session = get_session()
+    st.markdown("<h1 style='font-family: Arial, sans-serif;'>🎙 NoteNinja M.O.M Generator 📝 <span style='font-size:0.7em;'> (No Puns Intended)</span></h1>", unsafe_allow_html = True)
+
+    use_cache = st.sidebar.checkbox("Reuse cached results", value=True, help="Skip transcription and generation for inputs that were already processed")
+    label_speakers = st.sidebar.checkbox("Label speakers", value=False, help="Detect who is speaking and attribute decisions and action items to Speaker 1, Speaker 2, ...")
+    show_job_sidebar(session)
+    audio_input_type = st.radio("Select Audio Input:", ("Microphone", "System Audio"))
+    if audio_input_type == "Microphone":
+        st.success("Click the button below to start the recording and then press again to stop the recording and process the audio (It may need the second click after you allow access to your microphone):")
+        from audio_recorder_streamlit import audio_recorder
+        audio_bytes = audio_recorder(pause_threshold=1000.0, sample_rate=CAPTURE_PROFILE.sample_rate or 44_100)
+        if audio_bytes:
+            try:
+                st.audio(audio_bytes, format="audio/wav")
+                job = submit_once(session, job_kind("microphone"), audio_bytes, audio_job, audio_bytes, "recording.wav", "microphone", active_cache(), label_speakers)
+                show_job(job, "audio_download", "An error has occurred during audio processing")
+            except Exception as e:
+                st.write(f"An error has occurred during audio processing: {e}")
+    elif audio_input_type == "System Audio":
+      audio_source = st.radio("Select System Audio Source:", ("Upload Audio File", "System Recording"), horizontal = True)
+      if audio_source == "System Recording":
+        st.warning('''WARNING : This feature may not work on devices lacking Loopback. 
+        
+        You need to use a Virtual Audio Cable for inputting system audio.''')
+        start_recording = st.button("Start Recording")
+        stop_recording = st.button("Stop Recording and Process")
+        if start_recording:
+              if session.recording_thread and session.recording_thread.is_alive():
+                  st.write("Already recording...")
+              else:
+                  st.write("Starting the recording")
+                  session.stop_event.clear()
+                  import sounddevice as sd
+                  default_output_device = sd.query_devices(kind='output')
+                  channels = default_output_device['max_output_channels']
+                  sample_rate = int(default_output_device['default_samplerate'])
+                  cache = active_cache()
+                  segment_jobs = session.segment_jobs = []
+                  live = session.live = LiveMinutes(lambda prompt: generate_text(prompt, model))
+                  # One diarizer for the whole recording keeps speaker numbers consistent across segments.
+                  diarizer = Diarizer() if label_speakers else False
+                  session.recording_job = None
+                  # Transcribe each finished segment (and update the running notes) while the recording continues.
+                  session.recorder = StreamingRecorder(
+                      session.workspace.unique_path("-segments"), channels, sample_rate, segment_s=SEGMENT_SECONDS,
+                      profile=CAPTURE_PROFILE,
+                      on_segment=lambda path: segment_jobs.append(job_manager.submit(
+                          session.id, "segment", segment_job, path, cache, live, len(segment_jobs), diarizer))
+                  ).start()
+                  session.recording_thread = threading.Thread(target=audio_recording_sounddevice, args=(session.recorder, session.stop_event, channels, sample_rate))
+                  session.recording_thread.start()
+
+        if stop_recording:
+              if session.recording_thread and session.recording_thread.is_alive():
+                   session.stop_event.set()
+                   session.recording_thread.join()
+              try:
+                   if session.recorder:
+                       session.recorder.stop()
+                       print(f"Recording stats: {session.recorder.stats()}")
+                       session.recorder = None
+                   if session.live is not None:
+                       session.recording_job = job_manager.submit(session.id, "recording", recording_job, list(session.segment_jobs), session.live, active_cache())
+                       session.live = None
+              except Exception as e:
+                   st.write(f"An error has occurred during audio processing: {e}")
+        if session.live is not None:
+              show_live(session)
+        if session.recording_job is not None:
+              show_job(session.recording_job, "system_audio_download", "An error has occurred during audio processing")
+
+      elif audio_source == "Upload Audio File":
+          st.success("Please upload supported files only (MP3/WAV Files).")
+          uploaded_audio = st.file_uploader("Upload Audio File", type = ["mp3", "wav"])
+          if uploaded_audio:
+             try:
+                  if not uploaded_audio.name.lower().endswith((".mp3", ".wav")):
+                      st.write("Please upload a file that ends in either `.mp3` or `.wav`")
+                      return
+                  data = uploaded_audio.getvalue()
+                  job = submit_once(session, job_kind("upload"), data, audio_job, data, uploaded_audio.name, "audio upload", active_cache(), label_speakers)
+                  show_job(job, "audio_file_download", "Error during audio file upload and transcription")
+             except Exception as e:
+                    st.write(f"Error during audio file upload and transcription : {e}")
+            
+    st.markdown("---")
+    st.write("OR")
+    st.success("Upload one or more files to generate MOM (PDF, DOCX, TXT, VTT/SRT transcripts or EML emails)")
+
+    uploaded_files = st.file_uploader("Upload files", type=supported_extensions(), accept_multiple_files=True)
+
+    if uploaded_files:
+          try:
+             unsupported = [f.name for f in uploaded_files if extractor_for(f.name) is None]
+             if unsupported:
+                 st.write(f"Unsupported file type: {', '.join(unsupported)}")
+                 return
+             files = [(f.name, f.getvalue()) for f in uploaded_files]
+             files_key = " ".join(make_key("file", name, data) for name, data in files)
+             job = submit_once(session, "document", files_key, document_job, files, active_cache())
+             show_job(job, "file_download", "Error: Could not process the file")
+          except Exception as e:
+             st.write(f"Error: Could not process the file. {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import streamlit as st
+from noteninja.tracing import get_tracer
+
+WINDOWS = {"Last 5 minutes": 300, "Last hour": 3600, "Last 24 hours": 86400, "All recorded": None}
+
+def profiling():
+    st.set_page_config(
+        page_title="Profiling - NoteNinja",
+        page_icon="⏱️",
+        layout="wide"
+    )
+
+    st.title("Pipeline Profiling ⏱️")
+    st.write("Rolling latency per pipeline stage for every session served by this process.")
+
+    tracer = get_tracer()
+    window_label = st.selectbox("Time window", list(WINDOWS))
+    window_s = WINDOWS[window_label]
+    st.button("Refresh")  # any interaction reruns the page with fresh numbers
+
+    stats = tracer.stage_stats(window_s)
+    if not stats:
+        st.info("No stages have been traced yet. Generate a MOM on the Program page first.")
+        return
+
+    rows = []
+    for stage, entry in stats.items():
+        rows.append({
+            "Stage": stage,
+            "Count": entry["count"],
+            "Errors": entry["errors"],
+            "p50 (ms)": round(entry["p50_s"] * 1000, 1),
+            "p90 (ms)": round(entry["p90_s"] * 1000, 1),
+            "p99 (ms)": round(entry["p99_s"] * 1000, 1),
+            "Mean (ms)": round(entry["mean_s"] * 1000, 1),
+            "Total (s)": round(entry["sum_s"], 2),
+            "Bytes in": entry.get("bytes_in", 0),
+            "Bytes out": entry.get("bytes_out", 0),
+            "Tokens in": entry.get("tokens_in", 0),
+            "Tokens out": entry.get("tokens_out", 0),
+            "Cache hit rate": f"{entry['cache_hit_rate']:.0%}" if "cache_hit_rate" in entry else "",
+        })
+    st.dataframe(rows, use_container_width=True)
+
+    st.subheader("Share of total time")
+    st.bar_chart(rows, x="Stage", y="Total (s)")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="Download Prometheus metrics",
+            data=tracer.to_prometheus(window_s),
+            file_name="noteninja_metrics.prom",
+            mime="text/plain"
+        )
+    with col2:
+        st.download_button(
+            label="Download spans (JSON lines)",
+            data=tracer.to_jsonl(window_s),
+            file_name="noteninja_spans.jsonl",
+            mime="application/x-ndjson"
+        )
+
+if __name__ == "__main__":
+    profiling()
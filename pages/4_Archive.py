@@ -0,0 +1,79 @@
+import time
+from datetime import date, timedelta
+
+import streamlit as st
+from noteninja.archive import get_default_archive
+
+RESULTS = 20
+
+def show_meeting(archive, meeting_id):
+    from noteninja.pdf_render import render_mom_pdf
+    meeting = archive.get(meeting_id)
+    if meeting is None:
+        st.write("This meeting is no longer in the archive.")
+        return
+    st.markdown(meeting.mom)
+    st.text_area("Transcript", meeting.transcript, height=200, key=f"transcript_{meeting_id}", disabled=True)
+    st.download_button(
+        label="Download MOM as PDF",
+        data=render_mom_pdf(meeting.mom),
+        file_name=f"MOM_{meeting.meeting_date or meeting.id}.pdf",
+        mime="application/pdf",
+        key=f"download_{meeting_id}"
+    )
+
+def archive_page():
+    st.set_page_config(
+        page_title="Archive - NoteNinja",
+        page_icon="🗂️",
+        layout="wide"
+    )
+
+    st.title("Meeting Archive 🗂️")
+    archive = get_default_archive()
+    stats = archive.stats()
+    if not stats["enabled"]:
+        st.info("The archive is turned off (NOTENINJA_ARCHIVE=off).")
+        return
+    st.write(f"Search the minutes and transcripts of {stats['meetings']} archived meeting(s).")
+
+    query = st.text_input("Search", placeholder='e.g. vendor shortlist, "revised schedule", Q3-2024 budget')
+    col1, col2 = st.columns(2)
+    with col1:
+        use_dates = st.checkbox("Filter by meeting date")
+        date_range = st.date_input("Meeting dates", value=(date.today() - timedelta(days=90), date.today()), disabled=not use_dates)
+    with col2:
+        sources = st.multiselect("Source", archive.sources())
+    date_from = date_to = None
+    if use_dates and len(date_range) == 2:
+        date_from, date_to = date_range
+
+    started = time.perf_counter()
+    hits = archive.search(query, limit=RESULTS, date_from=date_from, date_to=date_to, sources=sources)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if not hits:
+        if stats["meetings"]:
+            st.info("No meetings match the search.")
+        else:
+            st.info("No meetings have been archived yet. Generate a MOM on the Program page first.")
+        return
+
+    if not query.strip():
+        order = "newest first"
+    elif hits[0].ranked:
+        order = "best matches first"
+    else:
+        order = "newest first; these words are too common to rank by, add more to narrow the search"
+    st.caption(f"{len(hits)} result(s) in {elapsed_ms:.1f} ms ({order})")
+
+    for hit in hits:
+        with st.expander(f"{hit.meeting_date or 'No date'} · {hit.title}"):
+            st.caption(hit.source + (f" · {hit.name}" if hit.name else ""))
+            if hit.snippet:
+                st.markdown(hit.snippet)
+            # Minutes, transcript and PDF are only loaded for meetings that are opened.
+            if st.checkbox("Show minutes", key=f"open_{hit.id}"):
+                show_meeting(archive, hit.id)
+
+if __name__ == "__main__":
+    archive_page()
@@ -0,0 +1,80 @@
+"""Voice-activity detection on synthetic signals."""
+import numpy as np
+import pytest
+
+from noteninja.audio_io import ArraySource
+from noteninja.vad import FRAME_MS, MIN_GAP_MS, PADDING_MS, detect_speech, mask_to_segments, speech_mask
+
+RATE = 16000
+FRAME = RATE * FRAME_MS // 1000
+PADDING = RATE * PADDING_MS // 1000
+
+
+def tone(seconds, amplitude=8000, frequency=440):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return amplitude * np.sin(2 * np.pi * frequency * t)
+
+
+def noise(seconds, amplitude=100, seed=0):
+    return np.random.default_rng(seed).normal(0, amplitude, int(seconds * RATE))
+
+
+def source(signal):
+    return ArraySource(np.clip(signal, -32768, 32767).astype(np.int16), RATE)
+
+
+def spans(segments):
+    return [(s.start, s.end) for s in segments]
+
+
+def test_tone_in_noise():
+    signal = noise(10)
+    for start, end in ((2, 4), (6, 7)):
+        signal[start * RATE:end * RATE] += tone(end - start)
+    segments = detect_speech(source(signal))
+    assert len(segments) == 2
+    for segment, (start, end) in zip(segments, ((2, 4), (6, 7))):
+        # Padded on both sides, edges within one frame.
+        assert segment.start == pytest.approx(start * RATE - PADDING, abs=FRAME)
+        assert segment.end == pytest.approx(end * RATE + PADDING, abs=FRAME)
+
+
+def test_digital_silence():
+    assert detect_speech(source(np.zeros(5 * RATE))) == []
+
+
+def test_continuous_tone_is_one_span():
+    signal = tone(5)
+    assert spans(detect_speech(source(signal))) == [(0, len(signal))]
+
+
+def test_empty_source():
+    assert detect_speech(source(np.zeros(0))) == []
+
+
+def test_hysteresis():
+    # Floor at -50 dB: speech starts at +10 dB and only stops below +5 dB.
+    levels = np.array([-50] * 50 + [-35] * 10 + [-43] * 10 + [-50] * 20 + [-43] * 10 + [-50] * 10, np.float32)
+    mask = speech_mask(levels, np.zeros(len(levels), np.float32))
+    assert not mask[:50].any()
+    assert mask[50:70].all()                # between the thresholds after speech: still speech
+    assert not mask[70:].any()              # between the thresholds after silence: still silence
+
+
+def test_noise_like_frames_do_not_start_speech():
+    levels = np.array([-50] * 50 + [-35] * 10 + [-50] * 50, np.float32)
+    assert not speech_mask(levels, np.full(len(levels), 0.5, np.float32)).any()
+
+
+def test_short_gaps_are_bridged():
+    gap = MIN_GAP_MS * RATE // 1000 // FRAME
+    short = np.array([True] * 20 + [False] * (gap - 1) + [True] * 20 + [False] * 50)
+    long = np.array([True] * 20 + [False] * (gap + 30) + [True] * 20 + [False] * 50)
+    n = 200 * FRAME
+    assert len(mask_to_segments(short, FRAME, RATE, n, padding_ms=0)) == 1
+    assert len(mask_to_segments(long, FRAME, RATE, n, padding_ms=0)) == 2
+
+
+def test_blips_are_dropped():
+    mask = np.array([False] * 20 + [True] * 3 + [False] * 50)
+    assert mask_to_segments(mask, FRAME, RATE, len(mask) * FRAME) == []
@@ -0,0 +1,44 @@
+"""WAV encodings accepted by the path-based transcription route."""
+import struct
+
+import numpy as np
+
+from noteninja.pipeline import transcribe_audio
+from noteninja.transcription import WavSource
+
+RATE = 16000
+
+
+class StubRecognizer:
+    def transcribe(self, segment):
+        return f"segment {segment.index}"
+
+
+def tone(seconds=3.0, amplitude=0.25):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return amplitude * np.sin(2 * np.pi * 440 * t)
+
+
+def write_float_wav(path, samples, channels=1):
+    data = np.repeat(samples, channels).astype("<f4").tobytes()
+    fmt = struct.pack("<HHIIHH", 3, channels, RATE, RATE * 4 * channels, 4 * channels, 32)
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data)) + b"WAVE")
+        f.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+        f.write(b"data" + struct.pack("<I", len(data)) + data)
+
+
+def test_float_wav_source(tmp_path):
+    path = str(tmp_path / "float.wav")
+    signal = tone()
+    write_float_wav(path, signal, channels=2)
+    with WavSource(path) as source:
+        assert (source.sample_rate, source.n_frames) == (RATE, len(signal))
+        expected = (signal * 32767).astype(np.int16)
+        assert np.abs(source.read(0, source.n_frames).astype(np.int32) - expected).max() <= 1
+
+
+def test_transcribe_float_wav_by_path(tmp_path):
+    path = str(tmp_path / "float.wav")
+    write_float_wav(path, tone())
+    assert transcribe_audio(path, backend=StubRecognizer()) == "segment 0"